@@ -0,0 +1,9 @@
+"""Grocery tracking chatbot: shared core for the text and voice front-ends.
+
+Only the text core is imported here; the voice front-end lives in
+``grocery.voice`` and pulls in its speech dependencies on first use.
+"""
+
+from .core import CATEGORY_KEYWORDS, GroceryChatbot, GroceryTracker
+
+__all__ = ["CATEGORY_KEYWORDS", "GroceryChatbot", "GroceryTracker"]
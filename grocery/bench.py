@@ -0,0 +1,211 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional
+
+from .core import CATEGORY_KEYWORDS, GroceryChatbot, GroceryTracker
+from .snapshot import SnapshotStore
+from .storage import JsonStore, SQLiteStore
+
+DEFAULT_MIX = {"add": 40, "remove": 30, "list": 20, "expiring": 10}
+
+
+def generate_inventory(count: int, seed: int = 0) -> Dict[str, dict]:
+    """A synthetic inventory in the groceries.json layout."""
+    rng = random.Random(seed)
+    categories = list(CATEGORY_KEYWORDS) + ["uncategorized"]
+    today = datetime.date.today()
+    now = datetime.datetime.now().isoformat()
+    inventory = {}
+    for i in range(count):
+        expiry = None
+        if rng.random() < 0.3:
+            expiry = (today + datetime.timedelta(days=rng.randint(-5, 60))).isoformat()
+        inventory[f"item{i}"] = {
+            "quantity": rng.randint(1, 20),
+            "category": rng.choice(categories),
+            "added_date": now,
+            "expiry_date": expiry
+        }
+    return inventory
+
+
+def generate_commands(count: int, item_count: int, mix: Dict[str, int] = None,
+                      seed: int = 0) -> List[str]:
+    """A synthetic command stream drawn from ``mix`` (command type -> weight)."""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    item_count = max(item_count, 1)
+    messages = []
+    for kind in rng.choices(kinds, weights, k=count):
+        item = f"item{rng.randrange(item_count)}"
+        if kind == "add":
+            messages.append(f"add {rng.randint(1, 5)} {item}")
+        elif kind == "remove":
+            messages.append(f"remove {rng.randint(1, 3)} {item}")
+        elif kind == "list":
+            messages.append("list inventory")
+        else:
+            messages.append("check expiring")
+    return messages
+
+
+def load_stream(path: str) -> List[str]:
+    """Read a recorded JSONL stream of ``{"message": ...}`` lines."""
+    with open(path, 'r') as f:
+        return [json.loads(line)["message"] for line in f if line.strip()]
+
+
+def save_stream(path: str, messages: Iterable[str]):
+    with open(path, 'w') as f:
+        for message in messages:
+            f.write(json.dumps({"message": message}) + "\n")
+
+
+def _bytes_written() -> Optional[int]:
+    # Linux-only: bytes passed to write() by this process, any file
+    try:
+        with open("/proc/self/io", 'r') as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    return samples[int(fraction * (len(samples) - 1))]
+
+
+def _command_type(message: str) -> str:
+    words = message.lower().split()
+    if not words:
+        return ""
+    if words[0] == "check" and len(words) > 1:
+        return " ".join(words[:2])
+    return words[0]
+
+
+def replay(bot: GroceryChatbot, messages: List[str]) -> dict:
+    """Run ``messages`` through the bot, timing each one by its verb."""
+    latencies: Dict[str, List[float]] = {}
+    written_before = _bytes_written()
+    start = time.perf_counter()
+    for message in messages:
+        t0 = time.perf_counter()
+        bot.process_message(message)
+        elapsed = time.perf_counter() - t0
+        kind = _command_type(message)
+        latencies.setdefault(kind, []).append(elapsed)
+    bot.tracker.flush()
+    total = time.perf_counter() - start
+    written_after = _bytes_written()
+
+    commands = {}
+    for kind, samples in latencies.items():
+        samples.sort()
+        commands[kind] = {
+            "count": len(samples),
+            "p50_ms": _percentile(samples, 0.50) * 1000,
+            "p99_ms": _percentile(samples, 0.99) * 1000,
+        }
+    return {
+        "commands": len(messages),
+        "seconds": total,
+        "throughput": len(messages) / total if total else 0.0,
+        "bytes_written": (written_after - written_before
+                          if written_before is not None and written_after is not None else None),
+        "by_command": commands,
+    }
+
+
+def open_tracker(workdir: str, storage: str, inventory: Dict[str, dict],
+                 commit_interval: float = 0.0) -> GroceryTracker:
+    json_file = os.path.join(workdir, "groceries.json")
+    with open(json_file, 'w') as f:
+        json.dump(inventory, f)
+    if storage == "sqlite":
+        store = SQLiteStore(os.path.join(workdir, "groceries.db"))
+        store.import_json(json_file)
+        return GroceryTracker(store=store)
+    if storage == "snapshot":
+        return GroceryTracker(store=SnapshotStore(json_file))
+    if storage == "json":
+        return GroceryTracker(store=JsonStore(json_file, commit_interval))
+    return GroceryTracker(json_file, journal=True)
+
+
+def format_report(result: dict) -> str:
+    lines = [
+        f"{result['commands']} commands in {result['seconds']:.3f}s "
+        f"({result['throughput']:.0f} commands/s)",
+    ]
+    if result["bytes_written"] is not None:
+        lines.append(f"bytes written: {result['bytes_written']}")
+    lines.append(f"{'command':<16} {'count':>8} {'p50 ms':>10} {'p99 ms':>10}")
+    for kind, stats in sorted(result["by_command"].items()):
+        lines.append(f"{kind:<16} {stats['count']:>8} "
+                     f"{stats['p50_ms']:>10.3f} {stats['p99_ms']:>10.3f}")
+    return "\n".join(lines)
+
+
+def _parse_mix(text: str) -> Dict[str, int]:
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        mix[kind.strip()] = int(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay command streams against GroceryChatbot")
+    parser.add_argument("--items", type=int, default=10000,
+                        help="synthetic items to seed on top of --seed-file")
+    parser.add_argument("--seed-file", default="groceries.json")
+    parser.add_argument("--commands", type=int, default=10000)
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX,
+                        help="e.g. add=40,remove=30,list=20,expiring=10")
+    parser.add_argument("--stream", help="replay a recorded JSONL stream instead")
+    parser.add_argument("--record", help="write the generated stream to this JSONL file")
+    parser.add_argument("--storage", choices=["json", "journal", "sqlite", "snapshot"], default="json")
+    parser.add_argument("--commit-interval", type=float, default=0.0, metavar="SECONDS",
+                        help="with --storage json, batch writes made within this window")
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    inventory = generate_inventory(args.items, args.random_seed)
+    try:
+        with open(args.seed_file, 'r') as f:
+            inventory.update(json.load(f))
+    except FileNotFoundError:
+        pass
+
+    if args.stream:
+        messages = load_stream(args.stream)
+    else:
+        messages = generate_commands(args.commands, args.items, args.mix, args.random_seed)
+    if args.record:
+        save_stream(args.record, messages)
+
+    workdir = tempfile.mkdtemp(prefix="grocery-bench-")
+    try:
+        tracker = open_tracker(workdir, args.storage, inventory, args.commit_interval)
+        result = replay(GroceryChatbot(tracker), messages)
+        tracker.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(result, indent=2) if args.json else format_report(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import functools
+import json
+from collections import deque
+from typing import Dict, List
+
+
+class CategoryClassifier:
+    """Guess an item's category from a keyword table in one pass.
+
+    ``keywords`` maps category to keywords; categories listed first win
+    when an item matches several. All keywords are compiled into a single
+    Aho-Corasick automaton, so classifying costs O(len(item)) no matter how
+    large the table is, and results are memoized per item name.
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]], default: str = "uncategorized",
+                 cache_size: int = 4096):
+        self.default = default
+        self.categories = list(keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[int] = [-1]
+
+        for priority, words in enumerate(keywords.values()):
+            for word in words:
+                self._insert(word.lower(), priority)
+        self._link()
+        self.classify = functools.lru_cache(maxsize=cache_size)(self._classify)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "CategoryClassifier":
+        """Load a ``{"category": ["keyword", ...]}`` JSON table."""
+        with open(path, 'r') as f:
+            return cls(json.load(f), **kwargs)
+
+    def _insert(self, word: str, priority: int):
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(-1)
+            node = nxt
+        if self._out[node] < 0 or priority < self._out[node]:
+            self._out[node] = priority
+
+    def _link(self):
+        # Breadth-first pass setting failure links; each node's output is the
+        # best priority of any keyword ending there, including via its suffixes
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                inherited = out[fail[nxt]]
+                if inherited >= 0 and (out[nxt] < 0 or inherited < out[nxt]):
+                    out[nxt] = inherited
+
+    def _classify(self, item: str) -> str:
+        goto, fail, out = self._goto, self._fail, self._out
+        best = -1
+        node = 0
+        for ch in item.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            priority = out[node]
+            if priority >= 0 and (best < 0 or priority < best):
+                best = priority
+                if best == 0:
+                    break
+        return self.categories[best] if best >= 0 else self.default
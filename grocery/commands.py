@@ -0,0 +1,52 @@
+from typing import Callable, Dict, Iterable, Tuple, Union
+
+Handler = Callable[[str], str]
+
+
+class CommandRouter:
+    """Route a message to a handler by its leading verb.
+
+    Verbs may be one or two words ("add", "check expiring"); the two-word
+    form is tried first. Handlers get the rest of the message, with the
+    verb removed, and return the reply. Lookup is a dict hit, so adding
+    commands doesn't slow down the existing ones.
+    """
+
+    def __init__(self, fallback: Handler):
+        self.handlers: Dict[str, Handler] = {}
+        self.fallback = fallback
+
+    def register(self, verbs: Union[str, Iterable[str]], handler: Handler = None):
+        """Register ``handler`` for one or more verbs; usable as a decorator."""
+        if isinstance(verbs, str):
+            verbs = [verbs]
+
+        def decorator(func: Handler) -> Handler:
+            for verb in verbs:
+                self.handlers[verb.lower()] = func
+            return func
+
+        if handler is not None:
+            return decorator(handler)
+        return decorator
+
+    def route(self, message: str) -> Tuple[str, Handler, str]:
+        """The verb ``message`` starts with, its handler and the rest of the
+        message; the verb is empty when the fallback handles it."""
+        words = message.split()
+        verbs = [word.lower().strip("?!.,") for word in words[:2]]
+
+        if len(verbs) == 2:
+            verb = " ".join(verbs)
+            handler = self.handlers.get(verb)
+            if handler is not None:
+                return verb, handler, " ".join(words[2:])
+        if verbs:
+            handler = self.handlers.get(verbs[0])
+            if handler is not None:
+                return verbs[0], handler, " ".join(words[1:])
+        return "", self.fallback, message
+
+    def dispatch(self, message: str) -> str:
+        _, handler, args = self.route(message)
+        return handler(args)
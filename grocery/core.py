@@ -0,0 +1,443 @@
+import datetime
+import contextlib
+import time
+from typing import Dict, List, Optional
+
+from .categories import CategoryClassifier
+from .commands import CommandRouter
+from .history import EventLog
+from .index import CategoryIndex, ExpiryIndex
+from .items import Item
+from .matching import NameIndex, name_variants
+from .metrics import metrics
+from .storage import JournalStore, JsonStore
+
+class GroceryTracker:
+    def __init__(self, data_file="groceries.json", journal: bool = False, store=None,
+                 autosave: bool = True, history: bool = True, fuzzy_index: bool = None):
+        self.data_file = data_file
+        if store is None:
+            store = JournalStore(data_file) if journal else JsonStore(data_file)
+        self.store = store
+        # Typo-tolerant lookups need every name in a trigram index; stores
+        # that don't load the inventory into memory skip it unless asked
+        self.fuzzy_index = not store.indexed if fuzzy_index is None else fuzzy_index
+        # Adds and removes are kept next to the store's own file for analytics
+        history_file = getattr(store, "db_file", None) or getattr(store, "data_file", data_file)
+        self.history = EventLog(history_file + ".events" if history else None)
+        # With autosave off, changed items are only written by flush()
+        self.autosave = autosave
+        self._dirty = set()
+        self._undo = None
+        self.load_data()
+    
+    def load_data(self):
+        with metrics.timer("grocery_store_seconds", operation="load"):
+            self.inventory = self.store.load()
+        self.expiry_index = ExpiryIndex()
+        self.category_index = CategoryIndex()
+        # Built on the first lookup that needs it, so lazily loaded stores
+        # don't have to read every name at start up
+        self._name_index = None
+        if not self.store.indexed:
+            for item, details in self.inventory.items():
+                self._index(item, details, new=True)
+    
+    @property
+    def name_index(self) -> NameIndex:
+        if self._name_index is None:
+            self._name_index = NameIndex()
+            for item in self.inventory:
+                self._name_index.add(item)
+        return self._name_index
+    
+    def _index(self, item_key: str, details: Item, new: bool = False):
+        # Only new items need their name and expiry indexed, since quantity
+        # changes never move them; indexed stores answer the rest themselves
+        if new and self._name_index is not None:
+            self._name_index.add(item_key)
+        if self.store.indexed:
+            return
+        if new:
+            self.expiry_index.add(item_key, details.expiry_ordinal)
+        self.category_index.set(item_key, details.category, details.quantity)
+    
+    def _unindex(self, item_key: str):
+        if self._name_index is not None:
+            self._name_index.discard(item_key)
+        self.expiry_index.discard(item_key)
+        self.category_index.discard(item_key)
+    
+    def save_data(self):
+        with metrics.timer("grocery_store_seconds", operation="save"):
+            updates = self.store.save(self.inventory)
+            self.history.flush()
+        self._replace(updates or {})
+    
+    def _write(self, changes: Dict[str, Optional[Item]]):
+        with metrics.timer("grocery_store_seconds", operation="write"):
+            updates = self.store.write(changes, self.inventory)
+            self.history.flush()
+        # Other processes' changes the store merged in, if it shares its file
+        self._replace(updates or {})
+    
+    def _replace(self, items: Dict[str, Optional[Item]]):
+        for item_key, details in items.items():
+            self._unindex(item_key)
+            if details is None:
+                self.inventory.pop(item_key, None)
+            else:
+                self.inventory[item_key] = details
+                self._index(item_key, details, new=True)
+    
+    def _touch(self, item_key: str):
+        # Remember the item's state before the first change in a transaction
+        if self._undo is not None and item_key not in self._undo:
+            details = self.inventory.get(item_key)
+            self._undo[item_key] = details.copy() if details is not None else None
+    
+    def _persist(self, item_key: str):
+        if self._undo is not None:
+            return
+        if not self.autosave:
+            self._dirty.add(item_key)
+            return
+        self._write({item_key: self.inventory.get(item_key)})
+    
+    def flush(self):
+        """Write out everything changed since the last flush."""
+        if not self._dirty:
+            return
+        changes = {item_key: self.inventory.get(item_key) for item_key in self._dirty}
+        self._dirty = set()
+        self._write(changes)
+    
+    @contextlib.contextmanager
+    def transaction(self):
+        """Apply many changes in memory and write them out once at the end.
+
+        If the block raises, every item it touched is put back and nothing
+        is written. Nested transactions join the outermost one.
+        """
+        if self._undo is not None:
+            yield self
+            return
+        
+        self._undo = undo = {}
+        events = len(self.history)
+        try:
+            yield self
+            self._undo = None
+            if not self.autosave:
+                self._dirty.update(undo)
+                return
+            changes = {item_key: self.inventory.get(item_key) for item_key in undo}
+            if changes:
+                self._write(changes)
+        except BaseException:
+            self._undo = None
+            self.history.truncate(events)
+            self._rollback(undo)
+            raise
+    
+    def _rollback(self, undo: Dict[str, Optional[Item]]):
+        if self.store.indexed:
+            if self._dirty:
+                # Changes from before this transaction are still pending in
+                # the store, so put back only the items it touched
+                for item_key, details in undo.items():
+                    if details is not None:
+                        self.inventory[item_key] = details
+                    elif item_key in self.inventory:
+                        del self.inventory[item_key]
+            else:
+                self.store.rollback()
+            for item_key in undo:
+                if self._name_index is None:
+                    break
+                if item_key in self.inventory:
+                    self._name_index.add(item_key)
+                else:
+                    self._name_index.discard(item_key)
+            return
+        self._replace(undo)
+    
+    def close(self):
+        self.flush()
+        self.store.close()
+    
+    def find_item(self, item: str, fuzzy: bool = True) -> Optional[str]:
+        """The inventory key ``item`` refers to, allowing plurals and typos."""
+        item_key = item.lower()
+        if item_key in self.inventory:
+            return item_key
+        if self._name_index is None and not (fuzzy and self.fuzzy_index):
+            # Plurals can be found by probing their spellings, without
+            # building the index
+            for variant in name_variants(item_key):
+                if variant in self.inventory:
+                    return variant
+            return None
+        return self.name_index.find(item_key, fuzzy)
+    
+    def add_item(self, item: str, quantity: int, category: str = "uncategorized", 
+                 expiry_date: str = None):
+        # "apples" tops up an existing "apple", but typos still add a new item
+        item_key = self.find_item(item, fuzzy=False) or item.lower()
+        self._touch(item_key)
+        details = self.inventory.get(item_key)
+        new = details is None
+        if not new:
+            details.quantity += quantity
+        else:
+            details = Item.new(quantity, category.lower(), expiry_date)
+        self.inventory[item_key] = details
+        self._index(item_key, details, new)
+        self.history.record(item_key, details.category, quantity)
+        self._persist(item_key)
+        return f"Added {quantity} {item}(s) to your inventory."
+    
+    def remove_item(self, item: str, quantity: int = None):
+        # Only exact names and plurals are removed; a typo just gets a
+        # suggestion, since removing the wrong item can't be taken back
+        item_key = self.find_item(item, fuzzy=False)
+        if item_key is None:
+            guess = self.find_item(item)
+            if guess is not None:
+                return f"{item} not found in inventory. Did you mean {guess}?"
+            return f"{item} not found in inventory."
+        details = self.inventory[item_key]
+        if item_key != item.lower():
+            item = item_key
+        
+        self._touch(item_key)
+        removed = details.quantity if quantity is None else min(quantity, details.quantity)
+        self.history.record(item_key, details.category, -removed)
+        if quantity is None or quantity >= details.quantity:
+            del self.inventory[item_key]
+            self._unindex(item_key)
+            message = f"Removed all {item}(s) from inventory."
+        else:
+            details.quantity -= quantity
+            self.inventory[item_key] = details
+            self._index(item_key, details)
+            message = f"Removed {quantity} {item}(s). {details.quantity} remaining."
+        
+        self._persist(item_key)
+        return message
+    
+    def check_inventory(self):
+        if not self.inventory:
+            return "Your inventory is empty."
+        
+        if self.store.indexed:
+            index = CategoryIndex()
+            for item, category, quantity in self.store.query_inventory():
+                index.set(item, category, quantity)
+        else:
+            index = self.category_index
+        
+        return "Current Inventory:\n" + index.render()
+    
+    def check_expiring_soon(self, days: int = 7):
+        expiring = []
+        today = datetime.date.today()
+        threshold = today + datetime.timedelta(days=days)
+        
+        if self.store.indexed:
+            end = threshold + datetime.timedelta(days=1)
+            rows = [(item, datetime.datetime.fromisoformat(expiry_date).date())
+                    for item, expiry_date in self.store.query_expiring(today.isoformat(), end.isoformat())]
+        else:
+            rows = self.expiry_index.between(today, threshold)
+        
+        for item, expiry in rows:
+            expiring.append(f"{item} expires on {expiry.strftime('%Y-%m-%d')}")
+        
+        if not expiring:
+            return f"No items expiring within the next {days} days."
+        
+        result = f"Items expiring within {days} days:\n"
+        for item in expiring:
+            result += f"- {item}\n"
+        return result
+    
+    def _quantities(self) -> Dict[str, int]:
+        if self.store.indexed:
+            return {item: quantity for item, _, quantity in self.store.query_inventory()}
+        return {item: details.quantity for item, details in self.inventory.items()}
+    
+    def _category_totals(self) -> Dict[str, int]:
+        if self.store.indexed:
+            totals = {}
+            for _, category, quantity in self.store.query_inventory():
+                totals[category] = totals.get(category, 0) + quantity
+            return totals
+        return self.category_index.totals()
+    
+    def check_burn_rates(self, days: int = 30):
+        if not self.history.analytics:
+            return ANALYTICS_UNAVAILABLE
+        rates = self.history.burn_rates(days)
+        used = [(rates[i], name) for i, name in enumerate(self.history.names) if rates[i] > 0]
+        if not used:
+            return f"Nothing was used up in the last {days} days."
+        
+        result = f"Usage over the last {days} days:\n"
+        for rate, name in sorted(used, reverse=True):
+            result += f"- {name}: {rate:.2f} per day\n"
+        return result
+    
+    def check_run_out(self, days: int = 30):
+        if not self.history.analytics:
+            return ANALYTICS_UNAVAILABLE
+        forecast = self.history.run_out(self._quantities(), days)
+        if not forecast:
+            return "Nothing is being used up fast enough to forecast."
+        
+        result = f"Projected run-out dates (from the last {days} days of use):\n"
+        for item, date in forecast:
+            result += f"- {item} runs out around {date.strftime('%Y-%m-%d')}\n"
+        return result
+    
+    def check_category_totals(self, days: int = 7):
+        if not self.history.analytics:
+            return ANALYTICS_UNAVAILABLE
+        totals = self.history.category_totals(self._category_totals(), days)
+        if not totals:
+            return "Your inventory is empty."
+        
+        result = f"Stock by category over the last {days} days (oldest first):\n"
+        for category, stock in totals.items():
+            result += f"- {category.title()}: {', '.join(str(int(q)) for q in stock)}\n"
+        return result
+
+ANALYTICS_UNAVAILABLE = "Usage analytics need NumPy, which is not installed."
+
+# Earlier categories win when an item matches several; frozen comes before
+# dairy so "ice cream" isn't filed under "cream"
+CATEGORY_KEYWORDS = {
+    "produce": ["apple", "banana", "orange", "lettuce", "tomato", "broccoli", "carrot", "spinach"],
+    "frozen": ["ice cream", "frozen", "peas"],
+    "dairy": ["milk", "cheese", "yogurt", "butter", "cream"],
+    "meat": ["chicken", "beef", "pork", "fish", "egg"],
+    "pantry": ["bread", "rice", "pasta", "cereal", "flour", "sugar"],
+    "beverages": ["water", "juice", "soda", "coffee", "tea", "beer", "wine"]
+}
+
+class GroceryChatbot:
+    def __init__(self, tracker: GroceryTracker = None):
+        self.tracker = tracker if tracker is not None else GroceryTracker()
+        self.categories = ["produce", "dairy", "meat", "pantry", "frozen", "beverages"]
+        self.classifier = CategoryClassifier(CATEGORY_KEYWORDS)
+        self.router = CommandRouter(self._unknown_command)
+        self.router.register("add", self.parse_add_command)
+        self.router.register(["remove", "delete"], self.parse_remove_command)
+        self.router.register(["list", "inventory", "show", "check inventory"],
+                             lambda args: self.tracker.check_inventory())
+        self.router.register(["expiring", "expiry", "check expiring", "check expiry"],
+                             lambda args: self.tracker.check_expiring_soon())
+        self.router.register(["usage", "burn rate", "burn rates"],
+                             lambda args: self.tracker.check_burn_rates(self._days(args, 30)))
+        self.router.register(["forecast", "run out"],
+                             lambda args: self.tracker.check_run_out(self._days(args, 30)))
+        self.router.register(["totals", "category totals"],
+                             lambda args: self.tracker.check_category_totals(self._days(args, 7)))
+        self.router.register("help", lambda args: self.get_help())
+    
+    def parse_add_command(self, message: str):
+        parts = message.lower().split()
+        if parts and parts[0] == "add":
+            parts = parts[1:]
+        
+        quantity = 1
+        if parts and parts[0].isdigit():
+            quantity = int(parts[0])
+            item_parts = parts[1:]
+        else:
+            item_parts = parts
+        
+        expiry_date = None
+        item_string = " ".join(item_parts)
+        if "expires" in item_string:
+            item_string, expiry_str = item_string.split("expires")
+            try:
+                datetime.datetime.strptime(expiry_str.strip(), "%Y-%m-%d")
+                expiry_date = expiry_str.strip()
+            except ValueError:
+                pass
+        
+        item_name = item_string.strip()
+        category = self._guess_category(item_name)
+        
+        return self.tracker.add_item(item_name, quantity, category, expiry_date)
+    
+    def parse_remove_command(self, message: str):
+        parts = message.lower().split()
+        if parts and parts[0] in ("remove", "delete"):
+            parts = parts[1:]
+        
+        quantity = None
+        if parts and parts[0].isdigit():
+            quantity = int(parts[0])
+            item_name = " ".join(parts[1:])
+        else:
+            item_name = " ".join(parts)
+        
+        return self.tracker.remove_item(item_name, quantity)
+    
+    def _days(self, args: str, default: int) -> int:
+        # "usage 14" or "usage last 14 days"
+        for word in args.split():
+            if word.isdigit() and int(word) > 0:
+                return int(word)
+        return default
+    
+    def _guess_category(self, item: str):
+        return self.classifier.classify(item.lower())
+    
+    def process_message(self, message: str):
+        if not metrics.enabled:
+            return self.router.dispatch(message)
+        
+        verb, handler, args = self.router.route(message)
+        command = verb or "unknown"
+        status = "error"
+        start = time.perf_counter()
+        try:
+            reply = handler(args)
+            status = "ok"
+            return reply
+        finally:
+            metrics.observe("grocery_command_seconds", time.perf_counter() - start,
+                            command=command)
+            metrics.inc("grocery_commands_total", command=command, status=status)
+
+    def process_batch(self, messages: List[str]) -> List[str]:
+        """Run many commands with a single save; on error none of them stick."""
+        with self.tracker.transaction():
+            return [self.process_message(message) for message in messages]
+
+    def _unknown_command(self, message: str):
+        return "I didn't understand that command. Type 'help' for assistance."
+
+    def get_help(self):
+        return """
+Available commands:
+- Add [quantity] [item] [expires YYYY-MM-DD] - Add items to inventory
+- Remove [quantity] [item] - Remove items from inventory
+- List inventory - Show all items
+- Check expiring - Show items expiring soon
+- Usage [days] - Show how fast items are being used up
+- Forecast [days] - Show when items will run out
+- Totals [days] - Show stock per category day by day
+- Help - Show this help message
+
+Examples:
+- Add 3 apples
+- Add 1 milk expires 2025-12-25
+- Remove 2 apples
+- List inventory
+- Usage 14
+"""
+
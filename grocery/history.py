@@ -0,0 +1,265 @@
+import bisect
+import datetime
+import importlib.util
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from .storage import locked_file, replace_file
+
+# item id, quantity delta, unix time; one fixed-size row per event on disk
+RECORD = struct.Struct("<iid")
+DAY = 86400.0
+
+
+class EventLog:
+    """Every add and remove, kept as columns of item id, delta and timestamp.
+
+    Columns are stdlib arrays so recording is cheap and works without
+    NumPy; queries view them with ``np.frombuffer`` and answer for every
+    item in one vectorized pass. Events are appended to ``path`` as packed
+    rows, and item names and categories to ``path + ".items"``, one per id.
+    Events older than ``retention_days`` are dropped, and the file
+    rewritten without them, when the log is loaded.
+
+    Several processes can share a log: an id is only fixed when its name is
+    written out, under a lock on the .items file, so two writers never give
+    different items the same id.
+    """
+
+    # Queries need NumPy; recording doesn't, so it is only imported by the
+    # queries and starting a bot doesn't pay for loading it
+    analytics = importlib.util.find_spec("numpy") is not None
+
+    def __init__(self, path: Optional[str] = None, retention_days: Optional[float] = 365):
+        self.path = path
+        self.retention_days = retention_days
+        self.names: List[str] = []
+        self.categories: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.item = array('i')
+        self.delta = array('i')
+        self.timestamp = array('d')
+        self._saved_names = 0
+        self._saved_events = 0
+        # How much of the .items file has been read
+        self._names_end = 0
+        if path is not None:
+            self._load()
+
+    def _load(self):
+        # Other processes may share the log; holding the .items lock keeps
+        # them from appending while it is read and rewritten
+        with locked_file(self.path + ".items", 'a+b') as names:
+            self._read_names(names)
+            self._load_events()
+
+    def _read_names(self, f):
+        """Take in the names appended to the open .items file ``f`` since
+        we last read it, by this process or another."""
+        f.seek(self._names_end)
+        data = f.read()
+        # A torn line at the tail is dropped, so the next name starts a line
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(self._names_end + end)
+        for line in data[:end].decode("utf-8").splitlines():
+            name, _, category = line.partition("\t")
+            self._add_name(name, category)
+        self._names_end += end
+        self._saved_names = len(self.names)
+
+    def _load_events(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        # A torn row at the tail, or one naming an unsaved item, is dropped
+        whole = len(data) - len(data) % RECORD.size
+        self._load_columns(data[:whole])
+        kept = len(self.item) * RECORD.size
+
+        start = 0
+        if self.retention_days is not None:
+            start = bisect.bisect_left(self.timestamp, time.time() - self.retention_days * DAY)
+        if start:
+            del self.item[:start]
+            del self.delta[:start]
+            del self.timestamp[:start]
+            rows = data[start * RECORD.size:kept]
+            replace_file(self.path, lambda f: f.write(rows), 'wb')
+        elif kept < len(data):
+            with open(self.path, 'r+b') as f:
+                f.truncate(kept)
+        self._saved_events = len(self.item)
+
+    def _load_columns(self, data: bytes):
+        # Rows are <item, delta, time>: as ints, item and delta are every
+        # fourth value from 0 and 1; as doubles, time is every second one
+        ints = array('i', data)
+        doubles = array('d', data)
+        if sys.byteorder == "big":
+            ints.byteswap()
+            doubles.byteswap()
+        item = ints[0::4]
+        if item and max(item) >= len(self.names):
+            end = next(i for i, value in enumerate(item) if value >= len(self.names))
+            item = item[:end]
+        self.item = item
+        self.delta = ints[1:4 * len(item):4]
+        self.timestamp = doubles[1:2 * len(item):2]
+
+    def _add_name(self, name: str, category: str) -> int:
+        self._ids[name] = len(self.names)
+        self.names.append(name)
+        self.categories.append(category)
+        return self._ids[name]
+
+    def record(self, name: str, category: str, delta: int, timestamp: float = None):
+        item = self._ids.get(name)
+        if item is None:
+            item = self._add_name(name, category)
+        self.item.append(item)
+        self.delta.append(delta)
+        self.timestamp.append(time.time() if timestamp is None else timestamp)
+
+    def __len__(self) -> int:
+        return len(self.item)
+
+    def truncate(self, length: int):
+        """Forget events recorded after the first ``length`` (for rollback)."""
+        length = max(length, self._saved_events)
+        del self.item[length:]
+        del self.delta[length:]
+        del self.timestamp[length:]
+
+    def flush(self):
+        if self.path is None or self._saved_events == len(self.item):
+            return
+        with locked_file(self.path + ".items", 'a+b') as f:
+            self._save_names(f)
+            rows = b"".join(RECORD.pack(self.item[i], self.delta[i], self.timestamp[i])
+                            for i in range(self._saved_events, len(self.item)))
+            with open(self.path, 'ab') as events:
+                # Cut a torn row left by a crashed writer, or every row
+                # after it would be misread
+                size = os.fstat(events.fileno()).st_size
+                if size % RECORD.size:
+                    events.truncate(size - size % RECORD.size)
+                events.write(rows)
+        self._saved_events = len(self.item)
+
+    def _save_names(self, f):
+        # Ids are positions in the .items file, and other writers may have
+        # appended names since we last read it, so the ids given to names
+        # recorded here are provisional until they are written out
+        saved = self._saved_names
+        unsaved = list(zip(self.names[saved:], self.categories[saved:]))
+        for name, _ in unsaved:
+            del self._ids[name]
+        del self.names[saved:]
+        del self.categories[saved:]
+        self._read_names(f)
+
+        ids = {}
+        for item, (name, category) in enumerate(unsaved, saved):
+            ids[item] = self._ids.get(name)
+            if ids[item] is None:
+                ids[item] = self._add_name(name, category)
+        if any(item != new for item, new in ids.items()):
+            for i in range(self._saved_events, len(self.item)):
+                self.item[i] = ids.get(self.item[i], self.item[i])
+
+        lines = "".join(f"{name}\t{category}\n" for name, category in
+                        zip(self.names[self._saved_names:], self.categories[self._saved_names:]))
+        if lines:
+            data = lines.encode("utf-8")
+            f.write(data)
+            f.flush()
+            self._names_end += len(data)
+            self._saved_names = len(self.names)
+
+    def _columns(self, since: float):
+        """NumPy views of the item, delta and timestamp columns, and where
+        the events at or after ``since`` start."""
+        import numpy as np
+        # Zero-copy views; they must not outlive the query, since an array
+        # can't grow while a view of it exists
+        timestamp = np.frombuffer(self.timestamp, dtype=np.float64)
+        # Events are recorded in time order, so the window is a suffix
+        start = int(np.searchsorted(timestamp, since))
+        return (np.frombuffer(self.item, dtype=np.int32),
+                np.frombuffer(self.delta, dtype=np.int32), timestamp, start)
+
+    def burn_rates(self, days: float = 30, now: float = None) -> "np.ndarray":
+        """Units consumed per day over the last ``days``, indexed by item id.
+
+        An item first seen partway through the window is rated over the
+        time since then (at least a day), not the whole window.
+        """
+        import numpy as np
+        now = time.time() if now is None else now
+        since = now - days * DAY
+        item, delta, timestamp, start = self._columns(since)
+        consumed = np.bincount(item[start:], weights=np.minimum(delta[start:], 0) * -1.0,
+                               minlength=len(self.names))
+        first = np.full(len(self.names), now)
+        seen, first_event = np.unique(item[start:], return_index=True)
+        first[seen] = timestamp[start:][first_event]
+        first[item[:start]] = since
+        span = np.maximum((now - first) / DAY, 1.0)
+        return consumed / span
+
+    def run_out(self, quantities: Dict[str, int], days: float = 30,
+                now: float = None) -> List[Tuple[str, datetime.date]]:
+        """Projected run-out date of each item in ``quantities``, soonest first.
+
+        Items with no consumption in the window never run out and are left out.
+        """
+        import numpy as np
+        now = time.time() if now is None else now
+        rates = self.burn_rates(days, now)
+        ids = np.array([self._ids.get(name, -1) for name in quantities], dtype=np.int64)
+        stock = np.fromiter(quantities.values(), dtype=np.float64, count=len(quantities))
+        known = ids >= 0
+        rate = np.zeros(len(ids))
+        rate[known] = rates[ids[known]]
+        consuming = np.flatnonzero(rate > 0)
+        days_left = stock[consuming] / rate[consuming]
+        order = np.argsort(days_left, kind="stable")
+        names = list(quantities)
+        today = datetime.date.fromtimestamp(now)
+        return [(names[consuming[i]], today + datetime.timedelta(days=int(days_left[i])))
+                for i in order]
+
+    def category_totals(self, current: Dict[str, int], days: int = 7,
+                        now: float = None) -> Dict[str, "np.ndarray"]:
+        """Stock per category at the end of each of the last ``days`` days.
+
+        Worked backwards from ``current`` (category -> quantity today), so
+        items stocked before history was kept still count.
+        """
+        import numpy as np
+        now = time.time() if now is None else now
+        today = datetime.datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0,
+                                                              microsecond=0).timestamp()
+        since = today - (days - 1) * DAY
+        item, delta, timestamp, start = self._columns(since)
+        item, delta, timestamp = item[start:], delta[start:], timestamp[start:]
+        categories = sorted(set(current) | set(self.categories[i] for i in np.unique(item)))
+        category_id = {category: i for i, category in enumerate(categories)}
+        category_of = np.array([category_id.get(category, -1) for category in self.categories],
+                               dtype=np.int64)
+        day = np.minimum((timestamp - since) // DAY, days - 1).astype(np.int64)
+        change = np.zeros((len(categories), days))
+        np.add.at(change, (category_of[item], day), delta)
+        # Stock at the end of day d is today's stock minus the changes after d
+        later = np.cumsum(change[:, ::-1], axis=1)[:, ::-1]
+        later = np.concatenate([later[:, 1:], np.zeros((len(categories), 1))], axis=1)
+        stock = np.array([current.get(category, 0) for category in categories],
+                         dtype=np.float64)[:, None] - later
+        return {category: stock[i] for i, category in enumerate(categories)}
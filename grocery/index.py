@@ -0,0 +1,92 @@
+import bisect
+import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+class ExpiryIndex:
+    """Items kept sorted by expiry date so range queries are O(log n + k).
+
+    Items already carry their expiry as a date ordinal, so nothing is parsed.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[int, str]] = []
+        self._expiry: Dict[str, int] = {}
+
+    def add(self, item: str, ordinal: Optional[int]):
+        if ordinal is None:
+            return
+        self.discard(item)
+        bisect.insort(self._entries, (ordinal, item))
+        self._expiry[item] = ordinal
+
+    def discard(self, item: str):
+        ordinal = self._expiry.pop(item, None)
+        if ordinal is None:
+            return
+        i = bisect.bisect_left(self._entries, (ordinal, item))
+        del self._entries[i]
+
+    def between(self, start: datetime.date, end: datetime.date) -> List[Tuple[str, datetime.date]]:
+        """Items expiring on or after ``start`` and on or before ``end``."""
+        lo = bisect.bisect_left(self._entries, (start.toordinal(),))
+        hi = bisect.bisect_left(self._entries, (end.toordinal() + 1,))
+        return [(item, datetime.date.fromordinal(ordinal))
+                for ordinal, item in self._entries[lo:hi]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CategoryIndex:
+    """Items grouped by category, with each category's report section cached.
+
+    Changing an item only invalidates the section of the category it was in
+    (and the one it moved to), so re-rendering an unchanged inventory is a
+    cache hit and a small change re-renders one section.
+    """
+
+    def __init__(self):
+        self._items: Dict[str, Dict[str, int]] = {}
+        self._category: Dict[str, str] = {}
+        self._sections: Dict[str, str] = {}
+        self._report = None
+
+    def set(self, item: str, category: str, quantity: int):
+        if self._category.get(item, category) != category:
+            self.discard(item)
+        self._items.setdefault(category, {})[item] = quantity
+        self._category[item] = category
+        self._sections.pop(category, None)
+        self._report = None
+
+    def discard(self, item: str):
+        category = self._category.pop(item, None)
+        if category is None:
+            return
+        items = self._items[category]
+        del items[item]
+        if not items:
+            del self._items[category]
+        self._sections.pop(category, None)
+        self._report = None
+
+    def _section(self, category: str) -> str:
+        section = self._sections.get(category)
+        if section is None:
+            lines = [f"\n{category.title()}:\n"]
+            lines.extend(f"  - {item} ({quantity})\n"
+                         for item, quantity in self._items[category].items())
+            section = self._sections[category] = "".join(lines)
+        return section
+
+    def totals(self) -> Dict[str, int]:
+        return {category: sum(items.values()) for category, items in self._items.items()}
+
+    def render(self) -> str:
+        if self._report is None:
+            self._report = "".join(self._section(category) for category in self._items)
+        return self._report
+
+    def __len__(self) -> int:
+        return len(self._category)
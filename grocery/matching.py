@@ -0,0 +1,148 @@
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Set
+
+# Plurals the suffix rules below get wrong; only consistency matters, since
+# inventory names and lookups go through the same function
+IRREGULAR = {
+    "cookies": "cookie", "brownies": "brownie", "veggies": "veggie",
+    "smoothies": "smoothie", "pies": "pie", "potatoes": "potato",
+    "tomatoes": "tomato", "mangoes": "mango", "avocadoes": "avocado",
+    "leaves": "leaf", "loaves": "loaf", "halves": "half", "knives": "knife",
+}
+
+
+def singularize(word: str) -> str:
+    if word in IRREGULAR:
+        return IRREGULAR[word]
+    if len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("ches", "shes", "sses", "xes", "zes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def normalize(name: str) -> str:
+    """Lowercase ``name`` with every word made singular."""
+    return " ".join(singularize(word) for word in name.lower().split())
+
+
+def name_variants(name: str) -> List[str]:
+    """Likely inventory keys for ``name``: its normalized form and the
+    plurals of its last word, all with the same :func:`normalize` form.
+
+    Lets a store that isn't held in memory be probed key by key instead of
+    indexing every name.
+    """
+    form = normalize(name)
+    if not form:
+        return []
+    head, _, word = form.rpartition(" ")
+    prefix = head + " " if head else ""
+    plurals = [word + "s", word + "es"]
+    if word.endswith("y"):
+        plurals.append(word[:-1] + "ies")
+    plurals.extend(plural for plural, singular in IRREGULAR.items() if singular == word)
+    variants = dict.fromkeys([form] + [prefix + plural for plural in plurals])
+    return [variant for variant in variants if normalize(variant) == form]
+
+
+def _could_be_typo(query: List[str], candidate: str) -> bool:
+    # A typo doesn't add or drop words, and numbers ("2%", "12 pack") name
+    # different products, so words with digits must match exactly
+    words = candidate.split()
+    return len(words) == len(query) and all(
+        a == b for a, b in zip(query, words)
+        if any(c.isdigit() for c in a + b))
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Inventory keys indexed for plural- and typo-tolerant lookup.
+
+    Names are normalized (see :func:`normalize`) and the normalized forms
+    indexed by trigram. A fuzzy lookup only walks the posting lists of the
+    query's rarest trigrams: a name sharing none of them can't reach the
+    ``threshold`` Jaccard similarity, so common trigrams are never scanned.
+    Fuzzy matches must also have the same number of words as the query and
+    the same numbers in them.
+    """
+
+    def __init__(self, threshold: float = 0.45):
+        self.threshold = threshold
+        self._names: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+
+    def add(self, name: str):
+        form = normalize(name)
+        names = self._names.get(form)
+        if names is None:
+            names = self._names[form] = set()
+            for gram in trigrams(form):
+                self._postings.setdefault(gram, set()).add(form)
+        names.add(name)
+
+    def discard(self, name: str):
+        form = normalize(name)
+        names = self._names.get(form)
+        if names is None:
+            return
+        names.discard(name)
+        if names:
+            return
+        del self._names[form]
+        for gram in trigrams(form):
+            posting = self._postings[gram]
+            posting.discard(form)
+            if not posting:
+                del self._postings[gram]
+
+    def __len__(self) -> int:
+        return sum(len(names) for names in self._names.values())
+
+    def _pick(self, form: str, name: str) -> str:
+        names = self._names[form]
+        return name if name in names else min(names)
+
+    def find(self, name: str, fuzzy: bool = True) -> Optional[str]:
+        """The indexed name ``name`` most likely refers to, if any."""
+        name = name.lower()
+        form = normalize(name)
+        if form in self._names:
+            return self._pick(form, name)
+        if not fuzzy or not form:
+            return None
+
+        grams = sorted(trigrams(form), key=lambda gram: len(self._postings.get(gram, ())))
+        need = math.ceil(self.threshold * len(grams))
+        prefix = len(grams) - need + 1
+        hits = Counter()
+        for gram in grams[:prefix]:
+            hits.update(self._postings.get(gram, ()))
+
+        query = set(grams)
+        words = form.split()
+        rest = len(grams) - prefix
+        best, best_key = None, None
+        best_score = self.threshold
+        for candidate, count in hits.most_common():
+            # Even sharing every remaining trigram couldn't match the best so far
+            if count + rest < best_score * len(query):
+                break
+            other = trigrams(candidate)
+            shared = len(query & other)
+            score = shared / (len(query) + len(other) - shared)
+            # Highest similarity wins; ties go to the alphabetically first name
+            key = (-score, candidate)
+            if (score >= self.threshold and (best_key is None or key < best_key)
+                    and _could_be_typo(words, candidate)):
+                best, best_key, best_score = candidate, key, score
+        return self._pick(best, name) if best is not None else None
@@ -0,0 +1,213 @@
+import bisect
+import json
+import threading
+import time
+from typing import Dict, Iterator, Sequence, TextIO, Tuple
+
+# Seconds; Prometheus' defaults with finer steps at the fast end, where
+# most commands land
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+DESCRIPTIONS = {
+    "grocery_commands_total": "Chat commands handled, by verb and outcome.",
+    "grocery_command_seconds": "Time to handle a chat command, by verb.",
+    "grocery_store_seconds": "Time spent loading and writing the inventory.",
+    "grocery_store_bytes_total": "Bytes read from and written to inventory files.",
+    "grocery_voice_seconds": "Time spent in each voice stage.",
+    "grocery_voice_results_total": "Outcomes of listening for a voice command.",
+}
+
+
+class Histogram:
+    """Counts of observations per bucket, plus their sum."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        # One slot per upper bound, and a last one for +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merged(self, other: "Histogram" = None) -> "Histogram":
+        """A new histogram holding this one's observations plus ``other``'s."""
+        result = Histogram(self.bounds)
+        result.counts = list(self.counts)
+        result.sum, result.count = self.sum, self.count
+        if other is not None:
+            result.counts = [a + b for a, b in zip(result.counts, other.counts)]
+            result.sum += other.sum
+            result.count += other.count
+        return result
+
+    def cumulative(self) -> Iterator[Tuple[float, int]]:
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class Metrics:
+    """Counters and latency histograms, exported as Prometheus text or JSONL.
+
+    Everything is off until :meth:`enable`. Hot paths check ``enabled``
+    before reading the clock, so with metrics off an instrumented call
+    costs one attribute lookup. Series are keyed by name and labels, and
+    labels should come from small fixed sets (command verbs, stage names).
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording; what was collected so far can still be exported."""
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+
+    # Series are keyed by labels in call order, which is cheaper than sorting
+    # on every update; exports merge keys that differ only in order
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        if not self.enabled:
+            return
+        key = tuple(labels.items())
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: str):
+        if not self.enabled:
+            return
+        key = tuple(labels.items())
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def timer(self, name: str, **labels: str) -> "Timer":
+        """Context manager observing how long its block takes into ``name``."""
+        return Timer(self, name, labels)
+
+    def _snapshot(self) -> Tuple[dict, dict]:
+        # Called with self._lock held
+        counters = {}
+        for name, series in self._counters.items():
+            merged = counters[name] = {}
+            for labels, value in series.items():
+                key = tuple(sorted(labels))
+                merged[key] = merged.get(key, 0) + value
+        histograms = {}
+        for name, series in self._histograms.items():
+            merged = histograms[name] = {}
+            for labels, histogram in series.items():
+                key = tuple(sorted(labels))
+                if key in merged:
+                    merged[key] = merged[key].merged(histogram)
+                else:
+                    merged[key] = histogram.merged(None)
+        return counters, histograms
+
+    def prometheus(self) -> str:
+        """Every series in the Prometheus text exposition format."""
+        with self._lock:
+            counters, histograms = self._snapshot()
+        lines = []
+        for name, series in sorted(counters.items()):
+            lines.append(f"# HELP {name} {DESCRIPTIONS.get(name, name)}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for name, series in sorted(histograms.items()):
+            lines.append(f"# HELP {name} {DESCRIPTIONS.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in sorted(series.items()):
+                for bound, count in histogram.cumulative():
+                    le = labels + (("le", "+Inf" if bound == float("inf") else repr(bound)),)
+                    lines.append(f"{name}_bucket{_format_labels(le)} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum!r}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def records(self, timestamp: float = None) -> Iterator[dict]:
+        """One JSON-ready dict per series, all stamped with the same time."""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            counters, histograms = self._snapshot()
+        for name, series in sorted(counters.items()):
+            for labels, value in sorted(series.items()):
+                yield {"time": timestamp, "name": name, "type": "counter",
+                       "labels": dict(labels), "value": value}
+        for name, series in sorted(histograms.items()):
+            for labels, histogram in sorted(series.items()):
+                yield {"time": timestamp, "name": name, "type": "histogram",
+                       "labels": dict(labels), "buckets": list(histogram.bounds),
+                       "counts": histogram.counts, "sum": histogram.sum,
+                       "count": histogram.count}
+
+    def write_jsonl(self, f: TextIO, timestamp: float = None):
+        """Append the current value of every series to ``f``, one JSON line each."""
+        for record in self.records(timestamp):
+            f.write(json.dumps(record) + "\n")
+
+
+class Timer:
+    """``with metrics.timer(...)``; a plain class, since a generator-based
+    context manager costs several times more per use."""
+
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics: Metrics, name: str, labels: dict):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.start = None
+
+    def __enter__(self):
+        if self.metrics.enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+# The process-wide registry the tracker, chatbot, stores and voice path report to
+metrics = Metrics()
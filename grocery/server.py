@@ -0,0 +1,291 @@
+import argparse
+import asyncio
+import json
+import os
+from typing import List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .core import GroceryChatbot, GroceryTracker
+from .metrics import metrics
+from .snapshot import SnapshotStore
+from .storage import JsonStore, SQLiteStore
+from .tenants import TenantManager
+
+STATUS = {
+    200: "200 OK",
+    400: "400 Bad Request",
+    404: "404 Not Found",
+    405: "405 Method Not Allowed",
+    500: "500 Internal Server Error",
+}
+
+
+def _json_object(body: bytes) -> dict:
+    """The request body as a JSON object; anything else is a bad request."""
+    payload = json.loads(body or b"{}")
+    if not isinstance(payload, dict):
+        raise ValueError("expected a JSON object")
+    return payload
+
+
+class GroceryServer:
+    """Local HTTP/JSON front-end for a shared GroceryChatbot.
+
+    Endpoints:
+        POST /message   {"message": "add 3 apples"} -> {"response": ...}
+        POST /batch     {"messages": [...]}         -> {"responses": [...]}
+        GET  /inventory                             -> {"response": ...}
+        GET  /expiring?days=7                       -> {"response": ...}
+        GET  /metrics[?format=jsonl]                -> Prometheus text (or JSONL)
+        POST /metrics   {"enabled": true}           -> {"enabled": true}
+
+    Commands from /message are queued to a single writer task. Whatever has
+    piled up while the writer was busy is applied as one tracker transaction,
+    so persistence happens once per batch instead of once per request.
+
+    With a :class:`TenantManager`, requests carrying an ``X-Household``
+    header go to that household's inventory, and resident households are
+    flushed every ``flush_interval`` seconds.
+    """
+
+    def __init__(self, bot: GroceryChatbot = None, max_batch: int = 512,
+                 tenants: TenantManager = None, flush_interval: float = 5.0):
+        self.bot = bot
+        self.max_batch = max_batch
+        self.tenants = tenants
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = None
+        self._tasks = []
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080):
+        self.queue = asyncio.Queue()
+        self._tasks.append(asyncio.create_task(self._writer()))
+        if self.tenants is not None:
+            self._tasks.append(asyncio.create_task(self._flusher()))
+        return await asyncio.start_server(self._handle, host, port)
+
+    def bot_for(self, tenant: str = None) -> GroceryChatbot:
+        if tenant and self.tenants is not None:
+            return self.tenants.chatbot(tenant)
+        if self.bot is None:
+            raise ValueError("missing X-Household header")
+        return self.bot
+
+    async def submit(self, tenant: str, message: str) -> str:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((tenant, message, future))
+        return await future
+
+    async def _flusher(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.tenants.flush_all()
+
+    async def _writer(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            self._apply(batch)
+            # Let request handlers run before draining the next batch
+            await asyncio.sleep(0)
+
+    def _apply(self, batch: List[Tuple[str, str, asyncio.Future]]):
+        groups = {}
+        for tenant, message, future in batch:
+            groups.setdefault(tenant, []).append((message, future))
+        for tenant, requests in groups.items():
+            # Look the bot up only now, so an evicted tenant is reopened
+            # instead of writing into a closed tracker
+            try:
+                bot = self.bot_for(tenant)
+            except Exception as e:
+                for _, future in requests:
+                    future.set_exception(e)
+                continue
+            self._apply_one(bot, requests)
+
+    def _apply_one(self, bot: GroceryChatbot, requests: List[Tuple[str, asyncio.Future]]):
+        replies = []
+        try:
+            with bot.tracker.transaction():
+                for message, _ in requests:
+                    replies.append(bot.process_message(message))
+        except Exception:
+            # Retry one by one so a bad command only fails its own request.
+            # Metrics already counted the commands up to the failing one, so
+            # those are re-run through the router without counting again
+            attempted = len(replies) + 1
+            for i, (message, future) in enumerate(requests):
+                process = bot.router.dispatch if i < attempted else bot.process_message
+                try:
+                    with bot.tracker.transaction():
+                        reply = process(message)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(reply)
+            return
+
+        for (_, future), reply in zip(requests, replies):
+            future.set_result(reply)
+
+    async def _route(self, method: str, target: str, headers: dict, body: bytes):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        if url.path == "/metrics":
+            return self._metrics(method, query, body)
+        tenant = headers.get("x-household")
+        bot = self.bot_for(tenant)
+
+        if url.path == "/message":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            message = _json_object(body).get("message")
+            if not isinstance(message, str):
+                return 400, {"error": "expected {\"message\": \"...\"}"}
+            return 200, {"response": await self.submit(tenant, message)}
+        elif url.path == "/batch":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            messages = _json_object(body).get("messages")
+            if not isinstance(messages, list) or not all(isinstance(m, str) for m in messages):
+                return 400, {"error": "expected {\"messages\": [\"...\", ...]}"}
+            return 200, {"responses": bot.process_batch(messages)}
+        elif url.path == "/inventory":
+            return 200, {"response": bot.tracker.check_inventory()}
+        elif url.path == "/expiring":
+            days = int(query.get("days", ["7"])[0])
+            return 200, {"response": bot.tracker.check_expiring_soon(days)}
+        else:
+            return 404, {"error": f"no route for {url.path}"}
+
+    def _metrics(self, method: str, query: dict, body: bytes):
+        if method == "POST":
+            enabled = _json_object(body).get("enabled")
+            if not isinstance(enabled, bool):
+                return 400, {"error": "expected {\"enabled\": true|false}"}
+            if enabled:
+                metrics.enable()
+            else:
+                metrics.disable()
+            return 200, {"enabled": metrics.enabled}
+        if query.get("format", ["prometheus"])[0] == "jsonl":
+            text = "".join(json.dumps(record) + "\n" for record in metrics.records())
+            return 200, ("application/x-ndjson", text)
+        return 200, ("text/plain; version=0.0.4", metrics.prometheus())
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                try:
+                    status, payload = await self._route(method, target, headers, body)
+                except ValueError as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+
+                keep_alive = (version == "HTTP/1.1"
+                              and headers.get("connection", "").lower() != "close")
+                if isinstance(payload, tuple):
+                    # Plain-text bodies come as (content type, text)
+                    content_type, data = payload[0], payload[1].encode()
+                else:
+                    content_type, data = "application/json", json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {STATUS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    f"\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(server: GroceryServer, host: str, port: int):
+    listener = await server.start(host, port)
+    print(f"Grocery server listening on http://{host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def open_sqlite(data_file: str) -> SQLiteStore:
+    """The SQLite store next to ``data_file``, e.g. groceries.db for
+    groceries.json, seeded from ``data_file`` when it is first created."""
+    root, extension = os.path.splitext(data_file)
+    db_file = data_file if extension == ".db" else root + ".db"
+    new = not os.path.exists(db_file)
+    store = SQLiteStore(db_file)
+    if new and db_file != data_file and os.path.exists(data_file):
+        store.import_json(data_file)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the grocery chatbot over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-file", default="groceries.json",
+                        help="inventory file; --storage sqlite uses the .db file beside it")
+    parser.add_argument("--storage", choices=["json", "journal", "sqlite", "snapshot"], default="journal")
+    parser.add_argument("--households", metavar="DIR",
+                        help="serve one inventory per X-Household header from DIR")
+    parser.add_argument("--resident", type=int, default=64,
+                        help="households kept in memory at once")
+    parser.add_argument("--commit-interval", type=float, default=0.0, metavar="SECONDS",
+                        help="with --storage json, batch writes made within this window")
+    parser.add_argument("--metrics", action="store_true",
+                        help="start with metrics collection on (toggle with POST /metrics)")
+    args = parser.parse_args()
+
+    if args.metrics:
+        metrics.enable()
+
+    if args.households:
+        tracker = None
+        tenants = TenantManager(args.households, capacity=args.resident, storage=args.storage)
+        server = GroceryServer(tenants=tenants)
+    else:
+        if args.storage == "sqlite":
+            tracker = GroceryTracker(store=open_sqlite(args.data_file))
+        elif args.storage == "snapshot":
+            tracker = GroceryTracker(store=SnapshotStore(args.data_file))
+        elif args.storage == "json":
+            tracker = GroceryTracker(store=JsonStore(args.data_file, args.commit_interval))
+        else:
+            tracker = GroceryTracker(args.data_file, journal=args.storage == "journal")
+        tenants = None
+        server = GroceryServer(GroceryChatbot(tracker))
+
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if tracker is not None:
+            tracker.close()
+        if tenants is not None:
+            tenants.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,470 @@
+import bisect
+import datetime
+import heapq
+import json
+import mmap
+import os
+import struct
+import threading
+from collections.abc import MutableMapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .items import Item, decode_expiry, inventory_from_json
+from .metrics import metrics
+from .storage import ChangeLog, JsonStore, file_stamp, locked_file, read_json, replace_file
+
+MAGIC = b"GROCSNAP"
+VERSION = 1
+# magic, version, reserved, record count, name table offset, expiry table offset
+HEADER = struct.Struct("<8sHHIQQ")
+EXPIRY_ENTRY = struct.Struct("<qQ")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_OFFSET = struct.Struct("<Q")
+
+# Item.added and Item.expiry are an int, a string or None
+_NONE, _INT, _STR = 0, 1, 2
+
+
+def _pack_value(value) -> bytes:
+    if value is None:
+        return bytes((_NONE,))
+    if isinstance(value, int):
+        return bytes((_INT,)) + _I64.pack(value)
+    data = value.encode("utf-8")
+    return bytes((_STR,)) + _U16.pack(len(data)) + data
+
+
+def _unpack_value(buf, pos: int):
+    tag = buf[pos]
+    if tag == _NONE:
+        return None, pos + 1
+    if tag == _INT:
+        return _I64.unpack_from(buf, pos + 1)[0], pos + 9
+    length = _U16.unpack_from(buf, pos + 1)[0]
+    return bytes(buf[pos + 3:pos + 3 + length]).decode("utf-8"), pos + 3 + length
+
+
+def encode_record(name: str, item: Item) -> bytes:
+    """One record: a u32 length, then name, quantity, category, added, expiry."""
+    name_bytes = name.encode("utf-8")
+    category = item.category.encode("utf-8")
+    payload = b"".join((_U16.pack(len(name_bytes)), name_bytes, _I64.pack(item.quantity),
+                        _U16.pack(len(category)), category,
+                        _pack_value(item.added), _pack_value(item.expiry)))
+    return _U32.pack(len(payload)) + payload
+
+
+def write_snapshot(path: str, items: Iterable[Tuple[str, Item]]) -> tuple:
+    """Atomically write ``items``, which must come in name order, to ``path``;
+    returns the new file's stamp."""
+    def write(f):
+        f.write(b"\0" * HEADER.size)
+        offsets = []
+        expiring = []
+        position = HEADER.size
+        for name, item in items:
+            record = encode_record(name, item)
+            f.write(record)
+            offsets.append(position)
+            if item.expiry_ordinal is not None:
+                expiring.append((item.expiry_ordinal, name, position))
+            position += len(record)
+        names_at = position
+        f.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+        expiring.sort()
+        f.write(b"".join(EXPIRY_ENTRY.pack(ordinal, offset) for ordinal, _, offset in expiring))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(offsets), names_at,
+                            names_at + len(offsets) * _OFFSET.size))
+
+    return replace_file(path, write, 'wb')
+
+
+class Snapshot:
+    """Read-only view of a snapshot file through mmap.
+
+    Nothing is decoded up front: a lookup bisects the name table, reading
+    names straight from the mapping, and only the record it lands on is
+    turned into an :class:`Item`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.count, self._names_at, self._expiry_at = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a grocery snapshot")
+        if version != VERSION:
+            raise ValueError(f"{path} is snapshot version {version}, expected {VERSION}")
+        self._expiry_count = (len(self._map) - self._expiry_at) // EXPIRY_ENTRY.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _offset(self, i: int) -> int:
+        return _OFFSET.unpack_from(self._map, self._names_at + i * _OFFSET.size)[0]
+
+    def _name(self, offset: int) -> bytes:
+        length = _U16.unpack_from(self._map, offset + 4)[0]
+        return self._map[offset + 6:offset + 6 + length]
+
+    def find(self, name: str) -> Optional[int]:
+        """Offset of the record for ``name``, or None."""
+        key = name.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name(self._offset(mid)) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count:
+            offset = self._offset(lo)
+            if self._name(offset) == key:
+                return offset
+        return None
+
+    def item(self, offset: int) -> Item:
+        buf = self._map
+        pos = offset + 6 + _U16.unpack_from(buf, offset + 4)[0]
+        quantity = _I64.unpack_from(buf, pos)[0]
+        length = _U16.unpack_from(buf, pos + 8)[0]
+        category = buf[pos + 10:pos + 10 + length].decode("utf-8")
+        added, pos = _unpack_value(buf, pos + 10 + length)
+        expiry, _ = _unpack_value(buf, pos)
+        return Item(quantity, category, added, expiry)
+
+    def entries(self) -> Iterator[Tuple[str, int]]:
+        """(name, record offset) for every record, in name order."""
+        for i in range(self.count):
+            offset = self._offset(i)
+            yield self._name(offset).decode("utf-8"), offset
+
+    def names(self) -> Iterator[str]:
+        for name, _ in self.entries():
+            yield name
+
+    def expiring(self, start: int, end: int) -> Iterator[Tuple[int, str]]:
+        """(ordinal, name) of records expiring in [start, end), soonest first."""
+        lo, hi = 0, self._expiry_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            ordinal = EXPIRY_ENTRY.unpack_from(self._map, self._expiry_at + mid * EXPIRY_ENTRY.size)[0]
+            if ordinal < start:
+                lo = mid + 1
+            else:
+                hi = mid
+        for i in range(lo, self._expiry_count):
+            ordinal, offset = EXPIRY_ENTRY.unpack_from(self._map,
+                                                       self._expiry_at + i * EXPIRY_ENTRY.size)
+            if ordinal >= end:
+                break
+            yield ordinal, self._name(offset).decode("utf-8")
+
+    def close(self):
+        self._map.close()
+
+
+_MISSING = object()
+
+
+class SnapshotInventory(MutableMapping):
+    """Dict-like view over a :class:`Snapshot` plus the changes made since.
+
+    Reads fall through to the mapped file; writes go to an in-memory
+    overlay (None marks a deletion). Like SQLite's implicit transaction,
+    changes since the last :meth:`commit` can be undone with :meth:`rollback`.
+    """
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+        self._overlay: Dict[str, Optional[Item]] = {}
+        self._undo: Dict[str, object] = {}
+        self._length = len(snapshot)
+        self._rows = None
+
+    def __getitem__(self, item: str) -> Item:
+        if item in self._overlay:
+            details = self._overlay[item]
+            if details is None:
+                raise KeyError(item)
+            # A copy, so in-place edits only land once they are assigned back
+            return details.copy()
+        offset = self.snapshot.find(item)
+        if offset is None:
+            raise KeyError(item)
+        return self.snapshot.item(offset)
+
+    def __contains__(self, item) -> bool:
+        if item in self._overlay:
+            return self._overlay[item] is not None
+        return self.snapshot.find(item) is not None
+
+    def _remember(self, item: str):
+        if item not in self._undo:
+            self._undo[item] = self._overlay.get(item, _MISSING)
+
+    def __setitem__(self, item: str, details: Item):
+        self._remember(item)
+        if item not in self:
+            self._length += 1
+        self._overlay[item] = details
+
+    def __delitem__(self, item: str):
+        if item not in self:
+            raise KeyError(item)
+        self._remember(item)
+        self._overlay[item] = None
+        self._length -= 1
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self.snapshot.names():
+            if name not in self._overlay:
+                yield name
+        for name, details in list(self._overlay.items()):
+            if details is not None:
+                yield name
+
+    def __len__(self) -> int:
+        return self._length
+
+    def changed(self) -> Dict[str, Optional[Item]]:
+        return self._overlay
+
+    def copy_changes(self) -> Dict[str, Optional[Item]]:
+        return {name: (details.copy() if details is not None else None)
+                for name, details in self._overlay.items()}
+
+    def commit(self):
+        self._undo = {}
+
+    def rollback(self):
+        for item, details in self._undo.items():
+            self._length -= item in self
+            if details is _MISSING:
+                del self._overlay[item]
+            else:
+                self._overlay[item] = details
+            self._length += item in self
+        self._undo = {}
+
+    def rows(self) -> List[Tuple[str, str, int]]:
+        """(name, category, quantity) of every item, grouped by category."""
+        # The snapshot never changes under us, so it is decoded at most once
+        if self._rows is None:
+            snapshot = self.snapshot
+            rows = []
+            for name, offset in snapshot.entries():
+                details = snapshot.item(offset)
+                rows.append((name, details.category, details.quantity))
+            rows.sort(key=lambda row: row[1])
+            self._rows = rows
+        overlay = self._overlay
+        if not overlay:
+            return list(self._rows)
+        rows = [row for row in self._rows if row[0] not in overlay]
+        rows.extend((name, details.category, details.quantity)
+                    for name, details in overlay.items() if details is not None)
+        # Two sorted runs, which sort() merges in linear time
+        rows.sort(key=lambda row: row[1])
+        return rows
+
+    def sorted_items(self, overlay: Dict[str, Optional[Item]] = None) -> Iterator[Tuple[str, Item]]:
+        """Every item in name order, merging the snapshot with ``overlay``,
+        by default a copy of the changes made so far."""
+        if overlay is None:
+            overlay = self.copy_changes()
+        snapshot = self.snapshot
+
+        def merged():
+            # On equal names the change (0) sorts before the record it replaces (1)
+            base = ((name, 1, offset) for name, offset in snapshot.entries())
+            changes = ((name, 0, details) for name, details in sorted(overlay.items()))
+            last = None
+            for name, source, value in heapq.merge(changes, base, key=lambda entry: entry[:2]):
+                if name == last:
+                    continue
+                last = name
+                if source == 1:
+                    yield name, snapshot.item(value)
+                elif value is not None:
+                    yield name, value
+
+        return merged()
+
+    def remap(self, snapshot: Snapshot, written: Dict[str, Optional[Item]]):
+        """Read from ``snapshot`` from now on, a compaction of this view taken
+        when the changes were ``written``; those still unchanged since are
+        in the new file and leave the overlay. Call with nothing uncommitted.
+        """
+        old = self.snapshot
+        for name, details in written.items():
+            if name in self._overlay and self._overlay[name] == details:
+                del self._overlay[name]
+        self.snapshot = snapshot
+        self._length = len(snapshot)
+        for name, details in self._overlay.items():
+            self._length += (details is not None) - (snapshot.find(name) is not None)
+        self._rows = None
+        old.close()
+
+
+class SnapshotStore:
+    """Binary snapshot read through mmap, plus an append-only change log.
+
+    The snapshot lives in ``<data_file minus .json>.snap`` and is built from
+    ``data_file`` the first time. ``load`` maps the file and returns a
+    :class:`SnapshotInventory`, so start up costs no parsing and items are
+    only decoded when touched. Changes go to a :class:`ChangeLog`, and
+    compaction writes a new snapshot by merging the old one with the
+    changes, in name order; the next write maps it in and drops the changes
+    it holds from the overlay.
+
+    ``save``, and ``close`` after any change, compact and write the
+    inventory back to ``data_file``, so the JSON and journal stores see it
+    too. If one of them changes ``data_file`` afterwards, the next ``load``
+    rebuilds the snapshot from it.
+    """
+
+    indexed = True
+
+    def __init__(self, data_file="groceries.json", compact_every=1000):
+        self.data_file = data_file
+        self.snapshot_file = os.path.splitext(data_file)[0] + ".snap"
+        # The stamp of data_file as the snapshot last matched it
+        self.source_file = self.snapshot_file + ".source"
+        self.log = ChangeLog(self.snapshot_file + ".log", type(self).__name__)
+        self.log_file = self.log.path
+        self.compact_every = compact_every
+        self.inventory = None
+        self._compactor = None
+        # The changes a finished compaction wrote, until the new snapshot
+        # is mapped in on the tracker's thread
+        self._compacted = None
+        # Whether data_file holds everything in the inventory
+        self._synced = False
+
+    def load(self) -> SnapshotInventory:
+        try:
+            with open(self.source_file, 'r') as f:
+                source = json.load(f)
+            source = tuple(source) if source is not None else None
+        except FileNotFoundError:
+            # Snapshots from before the JSON was written back are current
+            source = _MISSING
+        if not os.path.exists(self.snapshot_file) or (
+                source is not _MISSING and source != file_stamp(self.data_file)):
+            # The first run, or another store has changed data_file since we
+            # last wrote it. That store never saw anything left in our log
+            # by a crash, so its version wins and the log is dropped
+            data, stamp = read_json(self.data_file)
+            write_snapshot(self.snapshot_file, sorted(inventory_from_json(data).items()))
+            self._write_source(stamp)
+            self.log.rotate()
+            self.log.remove_old()
+            source = stamp
+        self.inventory = SnapshotInventory(Snapshot(self.snapshot_file))
+        replayed = self.log.replay(self.inventory)
+        self.inventory.commit()
+        self._synced = source is not _MISSING and not replayed
+        return self.inventory
+
+    def _write_source(self, stamp: Optional[tuple]):
+        replace_file(self.source_file, lambda f: json.dump(stamp, f))
+
+    def _write_json(self):
+        data = {name: details.to_dict() for name, details in self.inventory.sorted_items()}
+        with locked_file(self.data_file + ".lock"):
+            stamp = JsonStore.write_atomic(self.data_file, data)
+        metrics.inc("grocery_store_bytes_total", stamp[2],
+                    store=type(self).__name__, direction="written")
+        self._write_source(stamp)
+        self._synced = True
+
+    def write(self, changes: Dict[str, Optional[Item]], inventory):
+        self.log.append(changes)
+        self._synced = False
+        self.inventory.commit()
+        # Map in the last compaction before deciding to start another
+        self._remap()
+        if self.log.records >= self.compact_every:
+            self.compact(inventory)
+
+    def save(self, inventory: SnapshotInventory):
+        """Force a compaction, wait for it, map the new snapshot in and
+        write the inventory back to ``data_file``."""
+        self.wait()
+        self._remap()
+        self.compact(inventory)
+        self.wait()
+        self._remap()
+        self._write_json()
+
+    def rollback(self):
+        self.inventory.rollback()
+
+    def compact(self, inventory: SnapshotInventory):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        # A finished compaction not mapped in yet is superseded: the overlay
+        # still holds everything since the mapped snapshot, so this one
+        # writes a superset of it
+        self._compacted = None
+
+        with self.log.lock:
+            written = inventory.copy_changes()
+            items = inventory.sorted_items(written)
+            self.log.rotate()
+
+        self._compactor = threading.Thread(target=self._write_snapshot,
+                                           args=(items, written), daemon=True)
+        self._compactor.start()
+
+    def _write_snapshot(self, items: Iterable[Tuple[str, Item]],
+                        written: Dict[str, Optional[Item]]):
+        stamp = write_snapshot(self.snapshot_file, items)
+        metrics.inc("grocery_store_bytes_total", stamp[2],
+                    store=type(self).__name__, direction="written")
+        self.log.remove_old()
+        self._compacted = written
+
+    def wait(self):
+        if self._compactor is not None:
+            self._compactor.join()
+
+    def _remap(self):
+        # Swap in a finished compaction's snapshot and shrink the overlay;
+        # only between transactions, on the thread that owns the inventory
+        written = self._compacted
+        if written is None or self.inventory._undo:
+            return
+        self._compacted = None
+        self.inventory.remap(Snapshot(self.snapshot_file), written)
+
+    def query_inventory(self) -> List[Tuple[str, str, int]]:
+        return self.inventory.rows()
+
+    def query_expiring(self, start: str, end: str) -> List[Tuple[str, str]]:
+        """Items whose expiry falls in [start, end) as (name, expiry_date)."""
+        start = datetime.date.fromisoformat(start).toordinal()
+        end = datetime.date.fromisoformat(end).toordinal()
+        changed = self.inventory.changed()
+        rows = [(ordinal, name) for ordinal, name in self.inventory.snapshot.expiring(start, end)
+                if name not in changed]
+        for name, details in changed.items():
+            ordinal = details.expiry_ordinal if details is not None else None
+            if ordinal is not None and start <= ordinal < end:
+                bisect.insort(rows, (ordinal, name))
+        return [(name, decode_expiry(ordinal)) for ordinal, name in rows]
+
+    def close(self):
+        if self.inventory is not None and not self._synced:
+            self.save(self.inventory)
+        self.wait()
+        self.log.close()
+        if self.inventory is not None:
+            self.inventory.snapshot.close()
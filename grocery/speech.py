@@ -0,0 +1,226 @@
+import abc
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional
+
+import speech_recognition as sr
+
+CALIBRATION_FILE = os.path.expanduser("~/.grocery_bot_calibration.json")
+CALIBRATION_MAX_AGE = 3600  # seconds before the microphone is re-calibrated
+
+NUMBER_WORDS = {
+    "one": "1", "two": "2", "three": "3", "four": "4", "five": "5",
+    "six": "6", "seven": "7", "eight": "8", "nine": "9", "ten": "10",
+    "eleven": "11", "twelve": "12", "fifteen": "15", "twenty": "20",
+}
+
+
+class MicrophoneSource:
+    """Captures one phrase from a live microphone.
+
+    The ambient-noise calibration is saved to ``calibration_file`` and
+    reused for ``CALIBRATION_MAX_AGE`` seconds, so restarting the bot
+    doesn't mean another two seconds of silence.
+    """
+
+    def __init__(self, microphone: sr.Microphone = None, timeout: float = 5,
+                 phrase_time_limit: float = 5, calibration_file: str = CALIBRATION_FILE):
+        self.microphone = microphone if microphone is not None else sr.Microphone()
+        self.timeout = timeout
+        self.phrase_time_limit = phrase_time_limit
+        self.calibration_file = calibration_file
+
+    def load_calibration(self, recognizer: sr.Recognizer) -> bool:
+        try:
+            with open(self.calibration_file, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if time.time() - saved.get("saved_at", 0) > CALIBRATION_MAX_AGE:
+            return False
+        recognizer.energy_threshold = saved["energy_threshold"]
+        return True
+
+    def calibrate(self, recognizer: sr.Recognizer, duration: float = 2):
+        with self.microphone as source:
+            recognizer.adjust_for_ambient_noise(source, duration=duration)
+        try:
+            with open(self.calibration_file, 'w') as f:
+                json.dump({"energy_threshold": recognizer.energy_threshold,
+                           "saved_at": time.time()}, f)
+        except OSError:
+            pass
+
+    def capture(self, recognizer: sr.Recognizer) -> sr.AudioData:
+        with self.microphone as source:
+            return recognizer.listen(source, timeout=self.timeout,
+                                     phrase_time_limit=self.phrase_time_limit)
+
+
+class AudioFileSource:
+    """Plays back pre-recorded WAV/AIFF/FLAC files, one per capture.
+
+    Raises ``sr.WaitTimeoutError`` once the files run out, the same as a
+    silent microphone. Each AudioData carries its ``source_path``.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths = list(paths)
+        self._next = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self._next >= len(self.paths)
+
+    def load_calibration(self, recognizer: sr.Recognizer) -> bool:
+        return True
+
+    def calibrate(self, recognizer: sr.Recognizer, duration: float = 2):
+        pass
+
+    def capture(self, recognizer: sr.Recognizer) -> sr.AudioData:
+        if self.exhausted:
+            raise sr.WaitTimeoutError("no more audio files")
+        path = self.paths[self._next]
+        self._next += 1
+        with sr.AudioFile(path) as source:
+            audio = recognizer.record(source)
+        audio.source_path = path
+        return audio
+
+
+class RecognizerBackend(abc.ABC):
+    """Turns captured audio into text."""
+
+    @abc.abstractmethod
+    def recognize(self, recognizer: sr.Recognizer, audio: sr.AudioData) -> str:
+        """The text spoken in ``audio``."""
+
+    def set_vocabulary(self, words: Iterable[str], verbs: Iterable[str] = ()):
+        """Hint the words commands are made of; ignored by open-vocabulary backends."""
+
+
+class GoogleRecognizer(RecognizerBackend):
+    """Google Web Speech API; needs a network connection."""
+
+    def recognize(self, recognizer: sr.Recognizer, audio: sr.AudioData) -> str:
+        return recognizer.recognize_google(audio)
+
+
+class OfflineRecognizer(RecognizerBackend):
+    """Local PocketSphinx decoding constrained to the bot's vocabulary.
+
+    The vocabulary is compiled into a JSGF grammar of the form
+    ``<verb> [<number>] <word>*`` so the decoder only has to choose between
+    command verbs, quantities and known item words. Spoken numbers are
+    turned back into digits for the command parser.
+    """
+
+    def __init__(self, verbs: Iterable[str] = (), words: Iterable[str] = ()):
+        self.verbs = sorted(set(verbs))
+        self.words = sorted(set(words))
+        self._grammar_file = None
+
+    def set_vocabulary(self, words: Iterable[str], verbs: Iterable[str] = ()):
+        words = sorted(set(words))
+        verbs = sorted(set(verbs)) or self.verbs
+        if words != self.words or verbs != self.verbs:
+            self.words = words
+            self.verbs = verbs
+            self._discard_grammar()
+
+    def _discard_grammar(self):
+        if self._grammar_file is not None:
+            try:
+                os.remove(self._grammar_file)
+            except OSError:
+                pass
+            self._grammar_file = None
+
+    def _alternatives(self, phrases: Iterable[str]) -> str:
+        # JSGF tokens must be plain dictionary words
+        tokens = [" ".join(part for part in phrase.lower().split() if part.isalpha())
+                  for phrase in phrases]
+        return " | ".join(token for token in tokens if token)
+
+    def grammar(self) -> str:
+        lines = [
+            "#JSGF V1.0;",
+            "grammar grocery;",
+            "public <command> = <verb> [<number>] <word>*;",
+            f"<verb> = {self._alternatives(self.verbs) or 'help'};",
+            f"<number> = {self._alternatives(NUMBER_WORDS)};",
+            f"<word> = {self._alternatives(self.words) or 'item'};",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _grammar_path(self) -> str:
+        if self._grammar_file is None:
+            fd, path = tempfile.mkstemp(prefix="grocery-", suffix=".jsgf")
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.grammar())
+            self._grammar_file = path
+        return self._grammar_file
+
+    def recognize(self, recognizer: sr.Recognizer, audio: sr.AudioData) -> str:
+        if self.verbs or self.words:
+            text = recognizer.recognize_sphinx(audio, grammar=self._grammar_path())
+        else:
+            text = recognizer.recognize_sphinx(audio)
+        return " ".join(NUMBER_WORDS.get(word, word) for word in text.split())
+
+
+class ScriptedRecognizer(RecognizerBackend):
+    """Test double returning known transcripts for audio files.
+
+    Transcripts come from ``transcripts`` (keyed by file path) or from a
+    ``.txt`` file next to the audio. ``delay`` simulates decoder latency.
+    """
+
+    def __init__(self, transcripts: Dict[str, str] = None, delay: float = 0.0):
+        self.transcripts = dict(transcripts or {})
+        self.delay = delay
+
+    def recognize(self, recognizer: sr.Recognizer, audio: sr.AudioData) -> str:
+        if self.delay:
+            time.sleep(self.delay)
+        path = getattr(audio, "source_path", None)
+        if path in self.transcripts:
+            return self.transcripts[path]
+        if path is not None:
+            try:
+                with open(os.path.splitext(path)[0] + ".txt", 'r') as f:
+                    return f.read().strip()
+            except FileNotFoundError:
+                pass
+        raise sr.UnknownValueError()
+
+
+class TimedRecognizer(RecognizerBackend):
+    """Wraps another backend and records how long each call takes."""
+
+    def __init__(self, backend: RecognizerBackend):
+        self.backend = backend
+        self.latencies: List[float] = []
+
+    def set_vocabulary(self, words: Iterable[str], verbs: Iterable[str] = ()):
+        self.backend.set_vocabulary(words, verbs)
+
+    def recognize(self, recognizer: sr.Recognizer, audio: sr.AudioData) -> str:
+        start = time.perf_counter()
+        try:
+            return self.backend.recognize(recognizer, audio)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    def summary(self) -> Optional[Dict[str, float]]:
+        if not self.latencies:
+            return None
+        samples = sorted(self.latencies)
+        return {
+            "count": len(samples),
+            "p50_ms": samples[len(samples) // 2] * 1000,
+            "max_ms": samples[-1] * 1000,
+        }
@@ -0,0 +1,551 @@
+import contextlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .items import (Item, decode_added, decode_expiry, encode_added, encode_expiry,
+                    inventory_from_json, inventory_to_json)
+from .metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # no advisory locking on this platform
+    fcntl = None
+
+
+def _stamp_of(st: os.stat_result) -> tuple:
+    # Renaming a new file into place always changes at least one of these
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def file_stamp(path: str) -> Optional[tuple]:
+    """What changes whenever ``path`` is replaced or written; None if it is missing."""
+    try:
+        return _stamp_of(os.stat(path))
+    except FileNotFoundError:
+        return None
+
+
+def read_json(path: str) -> Tuple[Dict[str, dict], Optional[tuple]]:
+    """The inventory in a groceries.json file, and the stamp of the file
+    read (None, with an empty inventory, if there is no file)."""
+    try:
+        with open(path, 'r') as f:
+            stamp = _stamp_of(os.fstat(f.fileno()))
+            return json.load(f), stamp
+    except FileNotFoundError:
+        return {}, None
+
+
+def replace_file(path: str, write: Callable, mode: str = 'w') -> tuple:
+    """Atomically replace ``path`` with what ``write(f)`` writes; returns its stamp.
+
+    The data goes to a temp file in the same directory, is fsynced, and is
+    renamed into place, so readers see the old file or the new one.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_file = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".",
+                                    suffix=".tmp")
+    try:
+        # mkstemp creates the file private; keep the permissions the file had,
+        # or the umask default for a new one
+        try:
+            permissions = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            permissions = 0o666 & ~umask
+        os.chmod(tmp_file, permissions)
+        with os.fdopen(fd, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+            stamp = _stamp_of(os.fstat(f.fileno()))
+        os.replace(tmp_file, path)
+    except BaseException:
+        try:
+            os.remove(tmp_file)
+        except FileNotFoundError:
+            pass
+        raise
+    # Make the rename itself durable; not every platform can fsync a directory
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        pass
+    else:
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+    return stamp
+
+
+@contextlib.contextmanager
+def locked_file(path: str, mode: str = 'a+'):
+    """``path`` opened for appending and reading, under an exclusive lock
+    held until the block ends (where advisory locks are available)."""
+    with open(path, mode) as f:
+        if fcntl is None:
+            yield f
+            return
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield f
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _quantity(details: Optional[dict]) -> int:
+    return details["quantity"] if details is not None else 0
+
+
+def _set_or_pop(data: Dict[str, dict], item: str, details: Optional[dict]):
+    if details is None:
+        data.pop(item, None)
+    else:
+        data[item] = details
+
+
+class JsonStore:
+    """Whole-file JSON storage: every commit re-serializes the inventory.
+
+    Commits write a temp file, fsync it and rename it over ``data_file``, so
+    a crash leaves either the old file or the new one, never a torn one.
+    Each commit holds an advisory lock on ``<data_file>.lock``; if another
+    process has replaced the file since our last commit, our pending changes
+    are merged into its version instead of overwriting it, and so are all
+    later ones. Quantities merge as deltas against the version we last
+    synced with, so two writers each adding 1 apple to 2 leave 4; other
+    fields of an item are last-writer-wins, and an item either side took to
+    zero or below is gone. ``write`` and ``save`` return the other writers'
+    changes, as {item: Item or None}, for the caller to apply in memory.
+
+    With ``commit_interval`` set, changes made within that many seconds of
+    the last commit are held back and written together, by the next write
+    after the interval or by a timer, so a burst of commands costs one fsync.
+    """
+
+    # Stores that can answer check_inventory/check_expiring_soon themselves
+    indexed = False
+
+    def __init__(self, data_file="groceries.json", commit_interval: float = 0.0):
+        self.data_file = data_file
+        self.lock_file = data_file + ".lock"
+        self.commit_interval = commit_interval
+        self._lock = threading.RLock()
+        self._pending: Dict[str, Optional[dict]] = {}
+        self._next_commit = 0.0
+        self._timer = None
+        self._stamp = None
+        self._token = None
+        # Set once another writer shows up; from then on our inventory is
+        # missing their changes, so every commit merges into the file
+        self._shared = False
+        # The file as our inventory last saw it, for merging deltas
+        self._base: Dict[str, dict] = {}
+
+    def load(self) -> Dict[str, Item]:
+        with self._lock:
+            data = self._read()
+            self._base = dict(data)
+        return inventory_from_json(data)
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            with open(self.lock_file, 'r') as f:
+                self._token = f.read()
+        except FileNotFoundError:
+            self._token = ""
+        data, self._stamp = read_json(self.data_file)
+        if self._stamp is None:
+            return data
+        metrics.inc("grocery_store_bytes_total", self._stamp[2],
+                    store=type(self).__name__, direction="read")
+        return data
+
+    def write(self, changes: Dict[str, Optional[Item]], inventory: Dict) -> Dict[str, Optional[Item]]:
+        with self._lock:
+            for item, details in changes.items():
+                self._pending[item] = details.to_dict() if details is not None else None
+            if time.monotonic() >= self._next_commit:
+                return self._commit(inventory)
+            if self._timer is None:
+                self._timer = threading.Timer(self._next_commit - time.monotonic(),
+                                              self._commit_pending)
+                self._timer.daemon = True
+                self._timer.start()
+            return {}
+
+    def save(self, inventory: Dict) -> Dict[str, Optional[Item]]:
+        with self._lock:
+            current = inventory_to_json(inventory)
+            for item in self._base.keys() | current.keys():
+                if current.get(item) != self._base.get(item):
+                    self._pending[item] = current.get(item)
+            return self._commit(inventory)
+
+    def _commit_pending(self):
+        with self._lock:
+            self._timer = None
+            if self._pending:
+                self._commit()
+
+    def _commit(self, inventory: Dict = None) -> Dict[str, Optional[Item]]:
+        # Called with self._lock held. Without ``inventory`` (from the timer
+        # thread) only the pending changes are applied, to the file on disk
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        updates = {}
+        with self._file_lock() as lock:
+            if not self._shared and self._changed_on_disk(lock):
+                self._shared = True
+            if inventory is None or self._shared:
+                data = self._read()
+                # What the file would hold if nobody else had written to it
+                expected = dict(self._base)
+                for item, details in self._pending.items():
+                    _set_or_pop(expected, item, details)
+                    _set_or_pop(data, item, self._merge(self._base.get(item), details,
+                                                        data.get(item)))
+                for item in expected.keys() | data.keys():
+                    if expected.get(item) != data.get(item):
+                        updates[item] = data.get(item)
+            else:
+                data = inventory_to_json(inventory)
+            self._base = dict(data)
+            if inventory is None:
+                # Nobody applies these to memory yet; keep the versions memory
+                # is based on, so a later commit reports them again
+                for item in updates:
+                    _set_or_pop(self._base, item, expected.get(item))
+                updates = {}
+            self._stamp = self.write_atomic(self.data_file, data)
+            metrics.inc("grocery_store_bytes_total", self._stamp[2],
+                        store=type(self).__name__, direction="written")
+            self._token = os.urandom(8).hex()
+            lock.seek(0)
+            lock.truncate()
+            lock.write(self._token)
+            lock.flush()
+        self._pending = {}
+        self._next_commit = time.monotonic() + self.commit_interval
+        return {item: Item.from_dict(details) if details is not None else None
+                for item, details in updates.items()}
+
+    @staticmethod
+    def _merge(base: Optional[dict], mine: Optional[dict],
+               theirs: Optional[dict]) -> Optional[dict]:
+        # Their quantity plus what we added or removed since ``base``
+        quantity = _quantity(theirs) + _quantity(mine) - _quantity(base)
+        if quantity <= 0:
+            return None
+        return dict(mine if mine is not None else theirs, quantity=quantity)
+
+    def _changed_on_disk(self, lock) -> bool:
+        # Every commit leaves a fresh token in the lock file; the stat check
+        # also catches writers that don't take the lock
+        lock.seek(0)
+        if lock.read() != self._token:
+            return True
+        try:
+            st = os.stat(self.data_file)
+        except FileNotFoundError:
+            return self._stamp is not None
+        return self._stamp != _stamp_of(st)
+
+    def _file_lock(self):
+        return locked_file(self.lock_file)
+
+    @staticmethod
+    def write_atomic(path: str, data: Dict) -> tuple:
+        """Replace ``path`` with ``data`` as JSON, durably; returns its stamp."""
+        return replace_file(path, lambda f: json.dump(data, f, indent=2))
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        with self._lock:
+            if self._pending:
+                self._commit()
+            elif self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+class ChangeLog:
+    """Append-only log of inventory writes, one JSON line per write.
+
+    Each line holds the full state of every item the write changed, so a
+    torn line loses the whole write rather than part of a transaction, and
+    replaying a record twice is harmless. Compaction moves the log aside to
+    ``<path>.old`` with :meth:`rotate`, and removes that once the compacted
+    inventory is safely written.
+    """
+
+    def __init__(self, path: str, store: str):
+        self.path = path
+        self.old_path = path + ".old"
+        # Label for the bytes counted in metrics
+        self.store = store
+        # Held by append and rotate; a store compacting holds it while it
+        # captures the inventory, so no write falls between the two
+        self.lock = threading.RLock()
+        self.records = 0
+        self._file = None
+
+    def replay(self, inventory) -> int:
+        """Apply the rotated and current logs to ``inventory``; returns how
+        many records there were."""
+        old = self._replay(self.old_path, inventory)
+        self.records = self._replay(self.path, inventory)
+        return old + self.records
+
+    def _replay(self, path, inventory) -> int:
+        try:
+            f = open(path, 'rb+')
+        except FileNotFoundError:
+            return 0
+
+        count = 0
+        good = 0
+        last = b""
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                # A write of several items is one {"ops": [...]} line
+                for op in record.get("ops", (record,)):
+                    if op["op"] == "put":
+                        inventory[op["item"]] = Item.from_dict(op["details"])
+                    else:
+                        inventory.pop(op["item"], None)
+                    count += 1
+                good += len(line)
+                last = line
+            metrics.inc("grocery_store_bytes_total", good,
+                        store=self.store, direction="read")
+            # Drop a torn write at the tail so new appends start on a clean line
+            f.truncate(good)
+            if last and not last.endswith(b"\n"):
+                f.seek(good)
+                f.write(b"\n")
+        return count
+
+    def append(self, changes: Dict[str, Optional[Item]]):
+        ops = []
+        for item, details in changes.items():
+            if details is None:
+                ops.append({"op": "del", "item": item})
+            else:
+                ops.append({"op": "put", "item": item, "details": details.to_dict()})
+        if not ops:
+            return
+
+        with self.lock:
+            if self._file is None:
+                self._file = open(self.path, 'a')
+            data = json.dumps(ops[0] if len(ops) == 1 else {"ops": ops}) + "\n"
+            self._file.write(data)
+            self._file.flush()
+            # json.dumps escapes non-ASCII, so characters are bytes here
+            metrics.inc("grocery_store_bytes_total", len(data),
+                        store=self.store, direction="written")
+            self.records += len(ops)
+
+    def rotate(self):
+        """Start a new log; what was logged so far moves to ``old_path``."""
+        with self.lock:
+            self.close()
+            self.records = 0
+            if not os.path.exists(self.path):
+                return
+            if os.path.exists(self.old_path):
+                # A previous compaction never finished; keep its records too
+                with open(self.path, 'rb') as src, open(self.old_path, 'ab') as dst:
+                    dst.write(src.read())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.old_path)
+
+    def remove_old(self):
+        try:
+            os.remove(self.old_path)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class JournalStore(JsonStore):
+    """JSON snapshot plus an append-only log of mutations.
+
+    Each write is appended to ``<data_file>.log`` (see :class:`ChangeLog`).
+    Once ``compact_every`` records have piled up, the log is rotated to
+    ``<data_file>.log.old`` and a background thread folds the inventory
+    into a fresh snapshot, written to a temp file and renamed into place.
+    """
+
+    def __init__(self, data_file="groceries.json", compact_every=1000):
+        super().__init__(data_file)
+        self.log = ChangeLog(data_file + ".log", type(self).__name__)
+        self.log_file = self.log.path
+        self.compact_every = compact_every
+        self._compactor = None
+
+    def load(self) -> Dict[str, Item]:
+        inventory = super().load()
+        self.log.replay(inventory)
+        return inventory
+
+    def write(self, changes: Dict[str, Optional[Item]], inventory: Dict):
+        self.log.append(changes)
+        if self.log.records >= self.compact_every:
+            self.compact(inventory)
+
+    def save(self, inventory: Dict):
+        """Force a compaction and wait for it to finish."""
+        self.wait()
+        self.compact(inventory)
+        self.wait()
+
+    def compact(self, inventory: Dict):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+
+        with self.log.lock:
+            snapshot = inventory_to_json(inventory)
+            self.log.rotate()
+
+        self._compactor = threading.Thread(target=self._write_snapshot,
+                                           args=(snapshot,), daemon=True)
+        self._compactor.start()
+
+    def _write_snapshot(self, snapshot: Dict):
+        stamp = self.write_atomic(self.data_file, snapshot)
+        metrics.inc("grocery_store_bytes_total", stamp[2],
+                    store=type(self).__name__, direction="written")
+        self.log.remove_old()
+
+    def wait(self):
+        if self._compactor is not None:
+            self._compactor.join()
+
+    def close(self):
+        self.wait()
+        self.log.close()
+
+
+class SQLiteInventory(MutableMapping):
+    """Dict-like view over the ``items`` table; reads and writes go to SQL."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __getitem__(self, item: str) -> Item:
+        row = self.conn.execute(
+            "SELECT quantity, category, added_date, expiry_date FROM items WHERE name = ?",
+            (item,)).fetchone()
+        if row is None:
+            raise KeyError(item)
+        return Item(row[0], row[1], encode_added(row[2]), encode_expiry(row[3]))
+
+    def __setitem__(self, item: str, details: Item):
+        self.conn.execute(
+            "INSERT INTO items (name, quantity, category, added_date, expiry_date) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET quantity = excluded.quantity, "
+            "category = excluded.category, added_date = excluded.added_date, "
+            "expiry_date = excluded.expiry_date",
+            (item, details.quantity, details.category,
+             decode_added(details.added), decode_expiry(details.expiry)))
+
+    def __delitem__(self, item: str):
+        if self.conn.execute("DELETE FROM items WHERE name = ?", (item,)).rowcount == 0:
+            raise KeyError(item)
+
+    def __contains__(self, item) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM items WHERE name = ?", (item,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for (name,) in self.conn.execute("SELECT name FROM items"):
+            yield name
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+
+class SQLiteStore:
+    """SQLite storage keyed on item name, indexed on category and expiry.
+
+    ``load`` returns a :class:`SQLiteInventory` instead of reading every row,
+    so rows are only fetched when the tracker touches them. Writes go through
+    that mapping inside SQLite's implicit transaction and ``write`` commits.
+    """
+
+    indexed = True
+
+    def __init__(self, db_file="groceries.db"):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                name TEXT PRIMARY KEY,
+                quantity INTEGER NOT NULL,
+                category TEXT NOT NULL DEFAULT 'uncategorized',
+                added_date TEXT,
+                expiry_date TEXT
+            );
+            CREATE INDEX IF NOT EXISTS items_category ON items (category);
+            CREATE INDEX IF NOT EXISTS items_expiry ON items (expiry_date);
+        """)
+
+    def load(self) -> SQLiteInventory:
+        return SQLiteInventory(self.conn)
+
+    def import_json(self, data_file: str):
+        """Copy an existing groceries.json into the database."""
+        inventory = self.load()
+        for item, details in JsonStore(data_file).load().items():
+            inventory[item] = details
+        self.conn.commit()
+
+    def write(self, changes: Dict[str, Optional[Item]], inventory):
+        self.conn.commit()
+
+    def save(self, inventory):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def query_inventory(self) -> List[Tuple[str, str, int]]:
+        return self.conn.execute(
+            "SELECT name, category, quantity FROM items ORDER BY category").fetchall()
+
+    def query_expiring(self, start: str, end: str) -> List[Tuple[str, str]]:
+        """Items whose expiry_date falls in [start, end) as (name, expiry_date)."""
+        return self.conn.execute(
+            "SELECT name, expiry_date FROM items "
+            "WHERE expiry_date >= ? AND expiry_date < ? ORDER BY expiry_date",
+            (start, end)).fetchall()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from .core import GroceryChatbot, GroceryTracker
+from .snapshot import SnapshotStore
+from .storage import SQLiteStore
+
+
+class TenantManager:
+    """Lazily opened per-household inventories with an LRU of hot tenants.
+
+    Each household gets its own file under ``root``, sharded into
+    subdirectories by the first two hex digits of a hash of the tenant name.
+    At most ``capacity`` chatbots stay resident; the least recently used is
+    flushed and closed when a new one has to be opened. With ``write_back``
+    on, changes stay in memory until eviction or :meth:`flush_all`.
+    """
+
+    def __init__(self, root: str = "households", capacity: int = 64,
+                 storage: str = "journal", write_back: bool = True):
+        self.root = root
+        self.capacity = capacity
+        self.storage = storage
+        self.write_back = write_back
+        self._bots: "OrderedDict[str, GroceryChatbot]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def path_for(self, tenant: str) -> str:
+        digest = hashlib.sha1(tenant.encode("utf-8")).hexdigest()
+        extension = ".db" if self.storage == "sqlite" else ".json"
+        return os.path.join(self.root, digest[:2], digest + extension)
+
+    def _open(self, tenant: str) -> GroceryChatbot:
+        path = self.path_for(tenant)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        autosave = not self.write_back
+        if self.storage == "sqlite":
+            tracker = GroceryTracker(store=SQLiteStore(path), autosave=autosave)
+        elif self.storage == "snapshot":
+            tracker = GroceryTracker(store=SnapshotStore(path), autosave=autosave)
+        else:
+            tracker = GroceryTracker(path, journal=self.storage == "journal", autosave=autosave)
+        return GroceryChatbot(tracker)
+
+    def chatbot(self, tenant: str) -> GroceryChatbot:
+        with self._lock:
+            bot = self._bots.get(tenant)
+            if bot is not None:
+                self._bots.move_to_end(tenant)
+                return bot
+
+            bot = self._open(tenant)
+            self._bots[tenant] = bot
+            while len(self._bots) > self.capacity:
+                _, evicted = self._bots.popitem(last=False)
+                evicted.tracker.close()
+            return bot
+
+    def tracker(self, tenant: str) -> GroceryTracker:
+        return self.chatbot(tenant).tracker
+
+    def process_message(self, tenant: str, message: str) -> str:
+        return self.chatbot(tenant).process_message(message)
+
+    def resident(self):
+        """Tenants currently held in memory, least recently used first."""
+        with self._lock:
+            return list(self._bots)
+
+    def flush_all(self):
+        with self._lock:
+            for bot in self._bots.values():
+                bot.tracker.flush()
+
+    def close(self):
+        with self._lock:
+            while self._bots:
+                _, bot = self._bots.popitem(last=False)
+                bot.tracker.close()
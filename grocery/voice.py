@@ -0,0 +1,328 @@
+import difflib
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, List, Optional, Set
+
+from .core import CATEGORY_KEYWORDS, GroceryChatbot, GroceryTracker
+from .metrics import metrics
+
+# speech_recognition, pyttsx3 and .speech are imported on first "voice on"
+# so text-only sessions never pay for them
+if TYPE_CHECKING:
+    from .speech import RecognizerBackend
+
+_speech_worker = None
+
+
+class SpeechWorker:
+    """Speaks replies on a background thread so the bot can keep listening.
+
+    Utterances wait in a bounded queue; when it is full the oldest pending
+    one is dropped. cancel() clears the queue and cuts off the current
+    utterance, which is how the user barges in over a long reply.
+    """
+
+    def __init__(self, rate: int = 150, volume: float = 0.9, max_pending: int = 4,
+                 echo_window: float = 2.0, echo_similarity: float = 0.8):
+        self.rate = rate
+        self.volume = volume
+        self.echo_window = echo_window
+        self.echo_similarity = echo_similarity
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.speaking = threading.Event()
+        # Set by cancel(); the engine stops itself at the next word, since
+        # it may only be driven from this worker's thread
+        self._cancelled = threading.Event()
+        self.engine = None
+        self.error = None
+        self._last_text = ""
+        self._last_end = 0.0
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        # pyttsx3 engines must be driven from the thread that created them
+        try:
+            import pyttsx3
+            self.engine = pyttsx3.init()
+            self.engine.setProperty('rate', self.rate)  # Speed of speech
+            self.engine.setProperty('volume', self.volume)  # Volume level
+        except Exception as e:
+            self.error = e
+            self._ready.set()
+            return
+        try:
+            self.engine.connect('started-word', self._on_word)
+        except Exception:
+            pass  # without word callbacks, cancel() only drops pending replies
+        self._ready.set()
+
+        while True:
+            text = self.pending.get()
+            if text is None:
+                break
+            self._cancelled.clear()
+            self._last_text = text.lower()
+            self.speaking.set()
+            try:
+                with metrics.timer("grocery_voice_seconds", stage="speak"):
+                    self.engine.say(text)
+                    self.engine.runAndWait()
+            except Exception as e:
+                print(f"TTS Error: {e}")
+            finally:
+                self._last_end = time.monotonic()
+                self.speaking.clear()
+
+    def _on_word(self, name, location, length):
+        # Called by the engine inside runAndWait, on this worker's thread
+        if self._cancelled.is_set():
+            self.engine.stop()
+
+    def say(self, text: str):
+        while True:
+            try:
+                self.pending.put_nowait(text)
+                return
+            except queue.Full:
+                try:
+                    self.pending.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def cancel(self):
+        """Drop pending replies and stop the one being spoken."""
+        while True:
+            try:
+                self.pending.get_nowait()
+            except queue.Empty:
+                break
+        if self.speaking.is_set():
+            self._cancelled.set()
+
+    def is_echo(self, heard: str) -> bool:
+        """True if ``heard`` is the microphone picking up our own reply.
+
+        The whole utterance has to resemble the whole reply, so a command
+        that only shares words with it, like "remove milk" after "Added 2
+        milk(s)", still gets through.
+        """
+        recent = self.speaking.is_set() or time.monotonic() - self._last_end < self.echo_window
+        if not (recent and self._last_text):
+            return False
+        similarity = difflib.SequenceMatcher(None, heard.lower(), self._last_text).ratio()
+        return similarity >= self.echo_similarity
+
+    def close(self):
+        """Finish speaking what is queued, then stop the worker."""
+        self.pending.put(None)
+        self._thread.join()
+
+
+def get_speech_worker() -> SpeechWorker:
+    """The process-wide TTS worker, started on first use."""
+    global _speech_worker
+    if _speech_worker is None or not _speech_worker._thread.is_alive():
+        _speech_worker = SpeechWorker()
+    return _speech_worker
+
+
+class VoiceChatbot(GroceryChatbot):
+    """GroceryChatbot that can also listen for and speak commands."""
+
+    def __init__(self, tracker: GroceryTracker = None,
+                 recognizer_backend: "RecognizerBackend" = None, audio_source=None):
+        super().__init__(tracker)
+        self.router.register("voice on", self._voice_on)
+        self.router.register("voice off", self._voice_off)
+        self.voice_enabled = False
+        # None until the first "voice on" tries to set up speech
+        self.voice_available = None
+        # Utterances recognized by the background listener, oldest first
+        self.heard = queue.Queue()
+        self._listener = None
+        self.recognizer = None
+        self.recognizer_backend = recognizer_backend
+        self.audio_source = audio_source
+        self.speech = None
+        # (words, verbs) for the recognizer, rebuilt on the main thread as
+        # the inventory changes; the listener thread only reads it
+        self._vocabulary = None
+        self._vocabulary_words = None
+        self._sent_vocabulary = None
+    
+    def init_voice(self) -> bool:
+        """Import and set up speech recognition and text-to-speech on first use"""
+        if self.voice_available is not None:
+            return self.voice_available
+        
+        try:
+            import speech_recognition as sr
+            from .speech import GoogleRecognizer, MicrophoneSource
+            self.recognizer = sr.Recognizer()
+            if self.audio_source is None:
+                self.audio_source = MicrophoneSource()
+            if self.recognizer_backend is None:
+                self.recognizer_backend = GoogleRecognizer()
+            self.setup_microphone()
+            self.voice_available = True
+        except Exception as e:
+            print(f"Voice functionality not available: {e}")
+            self.voice_available = False
+            return False
+        
+        # Voice commands work without text-to-speech; replies are then
+        # only printed
+        try:
+            self.speech = get_speech_worker()
+        except Exception as e:
+            print(f"Text-to-speech not available, replies will only be printed: {e}")
+            self.speech = None
+        return True
+    
+    def setup_microphone(self):
+        """Adjust for ambient noise, reusing a recent calibration if there is one"""
+        if self.audio_source.load_calibration(self.recognizer):
+            return
+        print("Adjusting for ambient noise... Please wait.")
+        self.audio_source.calibrate(self.recognizer, duration=2)
+        print("Microphone is ready!")
+    
+    def vocabulary(self) -> List[str]:
+        """Words a voice command can contain besides its verb"""
+        return sorted(self._words())
+    
+    def _words(self) -> Set[str]:
+        words = set()
+        for name in self.tracker.inventory:
+            words.update(name.split())
+        for keywords in CATEGORY_KEYWORDS.values():
+            for keyword in keywords:
+                words.update(keyword.split())
+        return words
+    
+    def refresh_vocabulary(self):
+        """Update the recognizer vocabulary from the inventory; call it on
+        the thread that changes the inventory, not the listener's."""
+        words = self._words()
+        if words != self._vocabulary_words:
+            self._vocabulary_words = words
+            self._vocabulary = (tuple(sorted(words)), tuple(self.router.handlers))
+    
+    def process_message(self, message: str):
+        reply = super().process_message(message)
+        if self.voice_enabled:
+            self.refresh_vocabulary()
+        return reply
+    
+    def speak(self, text: str):
+        """Convert text to speech"""
+        print(f"Bot: {text}")  # Always print to console
+        
+        # Only use TTS if voice is enabled and available; the worker
+        # speaks in the background so this returns immediately
+        if self.voice_enabled and self.voice_available and self.speech:
+            self.speech.say(text)
+    
+    def listen(self) -> Optional[str]:
+        """Listen for voice input"""
+        if not (self.voice_enabled and self.voice_available):
+            return None
+        
+        import speech_recognition as sr
+        try:
+            print("Listening...")
+            with metrics.timer("grocery_voice_seconds", stage="listen"):
+                audio = self.audio_source.capture(self.recognizer)
+            
+            print("Processing...")
+            vocabulary = self._vocabulary
+            if vocabulary is not None and vocabulary is not self._sent_vocabulary:
+                self.recognizer_backend.set_vocabulary(*vocabulary)
+                self._sent_vocabulary = vocabulary
+            with metrics.timer("grocery_voice_seconds", stage="recognize"):
+                text = self.recognizer_backend.recognize(self.recognizer, audio)
+            if self.speech and self.speech.is_echo(text):
+                metrics.inc("grocery_voice_results_total", result="echo")
+                return None
+            metrics.inc("grocery_voice_results_total", result="recognized")
+            print(f"You (voice): {text}")
+            # Barge-in: the user spoke, so stop reading out the last reply
+            if self.speech:
+                self.speech.cancel()
+            return text
+        except sr.WaitTimeoutError:
+            metrics.inc("grocery_voice_results_total", result="timeout")
+            print("Listening timed out")
+            return None
+        except sr.UnknownValueError:
+            metrics.inc("grocery_voice_results_total", result="unrecognized")
+            print("Sorry, I didn't catch that.")
+            return None
+        except sr.RequestError as e:
+            metrics.inc("grocery_voice_results_total", result="request_error")
+            print(f"Could not request results; {e}")
+            return None
+        except Exception as e:
+            metrics.inc("grocery_voice_results_total", result="error")
+            print(f"Error in listening: {e}")
+            return None
+    
+    def start_listening(self):
+        """Capture voice commands on a background thread into ``self.heard``"""
+        if self._listener is not None and self._listener.is_alive():
+            return
+        self._listener = threading.Thread(target=self._listen_loop, daemon=True)
+        self._listener.start()
+    
+    def _listen_loop(self):
+        while self.voice_enabled and self.voice_available:
+            if getattr(self.audio_source, "exhausted", False):
+                break
+            text = self.listen()
+            if text is not None:
+                self.heard.put(text)
+    
+    def close(self):
+        self.voice_enabled = False
+        if self.speech:
+            self.speech.close()
+    
+    def _voice_on(self, args: str):
+        if self.init_voice():
+            self.refresh_vocabulary()
+            self.voice_enabled = True
+            return "Voice commands enabled."
+        else:
+            return "Voice functionality is not available on this system."
+
+    def _voice_off(self, args: str):
+        self.voice_enabled = False
+        return "Voice commands disabled."
+
+    def get_help(self):
+        return """
+Available commands:
+- Add [quantity] [item] [expires YYYY-MM-DD] - Add items to inventory
+- Remove [quantity] [item] - Remove items from inventory
+- List inventory - Show all items
+- Check expiring - Show items expiring soon
+- Usage [days] - Show how fast items are being used up
+- Forecast [days] - Show when items will run out
+- Totals [days] - Show stock per category day by day
+- Voice on/off - Enable/disable voice commands
+- Help - Show this help message
+- Quit/Exit - Exit the program
+
+Examples:
+- Add 3 apples
+- Add 1 milk expires 2025-12-25
+- Remove 2 apples
+- List inventory
+- Voice on
+"""
@@ -1,5 +1,7 @@
-import mpmath
+import sys
 
-mpmath.mp.dps = 1000  # Set decimal places to 1000
-pi_val = str(mpmath.mp.pi)
-print(pi_val)
+from pi_digits import pi_string
+
+# Digits come from the shared on-disk cache, computed on first use
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+print(pi_string(count))
@@ -1,10 +1,13 @@
-import mpmath
+import sys
 import tkinter as tk
-from tkinter import scrolledtext
+from itertools import groupby
+from tkinter import font as tkfont
 
-# Set precision for pi
-mpmath.mp.dps = 1000
-pi_val = str(mpmath.mp.pi)
+from pi_digits import digits
+
+# Decimal places to show; the view only ever holds what fits on screen, so
+# "python pi2.py 1000000" scrolls as smoothly as the default
+total_digits = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
 
 # Define special colors for each digit 0-9
 digit_colors = {
@@ -21,27 +24,119 @@ digit_colors = {
     '.': '#000000',  # Black for decimal point
 }
 
-# Create Tkinter window
-root = tk.Tk()
-root.title("Pi to 1000 Digits with Colors")
 
-# Create a scrolled text widget
-text_area = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=100, height=20)
-text_area.pack(padx=10, pady=10)
+def pi_chars(start, end, length):
+    """Characters [start, end) of "3.1415..." with ``length`` characters in all."""
+    end = min(end, length)
+    head = "3."[start:end]
+    first = max(start, 2)
+    return head + (digits(first - 2, end - first) if end > first else "")
+
+
+def insert_args(rows):
+    """Arguments for a single Text.insert call showing ``rows``, as (text,
+    tag) pairs with runs of equal characters sharing a pair."""
+    args = []
+    for char, run in groupby("\n".join(rows)):
+        args.append(char * len(list(run)))
+        args.append(char if char in digit_colors else "")
+    return args
+
+
+class DigitView(tk.Frame):
+    """A scrollable view of pi that only renders the rows on screen.
+
+    The Text widget holds exactly one screenful; scrolling moves ``top``
+    and redraws from the digit cache, so memory and redraw time don't
+    depend on how many digits there are.
+    """
+
+    def __init__(self, master, length, columns=100, rows=20):
+        super().__init__(master)
+        self.length = length
+        self.columns = columns
+        self.rows = rows
+        self.top = 0
+        self.text = tk.Text(self, wrap=tk.NONE, width=columns, height=rows)
+        self.scrollbar = tk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.font = tkfont.Font(font=self.text.cget("font"))
+
+        # Add color tags for each digit
+        for digit, color in digit_colors.items():
+            self.text.tag_configure(digit, foreground=color)
 
-# Add color tags for each digit
-for digit, color in digit_colors.items():
-    text_area.tag_configure(digit, foreground=color)
+        for widget in (self.text, self.scrollbar):
+            widget.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+            widget.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+            widget.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        self.text.bind("<Up>", lambda e: self.scroll(-1, "units"))
+        self.text.bind("<Down>", lambda e: self.scroll(1, "units"))
+        self.text.bind("<Prior>", lambda e: self.scroll(-1, "pages"))
+        self.text.bind("<Next>", lambda e: self.scroll(1, "pages"))
+        self.text.bind("<Home>", lambda e: self.yview("moveto", 0))
+        self.text.bind("<End>", lambda e: self.yview("moveto", 1))
+        self.text.bind("<Configure>", self._resize)
+        self.text.focus_set()
+        self.render()
 
-# Insert pi and apply color tags
-for char in pi_val:
-    if char in digit_colors:
-        text_area.insert(tk.END, char, char)
-    else:
-        text_area.insert(tk.END, char)
+    @property
+    def total_rows(self):
+        return -(-self.length // self.columns)
+
+    def _resize(self, event):
+        # Fit rows and columns to the new size, keeping the first visible
+        # character on the top row
+        padding = 2 * (int(self.text.cget("borderwidth")) + int(self.text.cget("highlightthickness")))
+        rows = max(1, (event.height - padding - 2 * int(self.text.cget("pady")))
+                   // self.font.metrics("linespace"))
+        columns = max(1, (event.width - padding - 2 * int(self.text.cget("padx")))
+                      // self.font.measure("0"))
+        if (rows, columns) != (self.rows, self.columns):
+            first = self.top * self.columns
+            self.rows, self.columns = rows, columns
+            self.top = first // columns
+            self.render()
+        return "break"
+
+    def scroll(self, amount, what):
+        step = self.rows if what == "pages" else 1
+        self.show(self.top + int(amount) * step)
+        return "break"
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.show(round(float(args[1]) * self.total_rows))
+        elif args[0] == "scroll":
+            self.scroll(args[1], args[2])
+        return "break"
+
+    def show(self, top):
+        top = max(0, min(top, self.total_rows - self.rows))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def render(self):
+        start = self.top * self.columns
+        chars = pi_chars(start, start + self.rows * self.columns, self.length)
+        rows = [chars[i:i + self.columns] for i in range(0, len(chars), self.columns)]
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        if rows:
+            self.text.insert("1.0", *insert_args(rows))
+        self.text.config(state=tk.DISABLED)
+        total = max(self.total_rows, 1)
+        self.scrollbar.set(self.top / total, min(self.top + self.rows, total) / total)
+
+
+# Create Tkinter window
+root = tk.Tk()
+root.title(f"Pi to {total_digits} Digits with Colors")
 
-# Disable editing
-text_area.config(state=tk.DISABLED)
+view = DigitView(root, total_digits + 2)  # "3." plus the decimal places
+view.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
 
 # Run the GUI application
 root.mainloop()
@@ -1,10 +1,28 @@
-import mpmath
+import argparse
+import time
+from collections import Counter
 import tkinter as tk
 import math
 
-# Set precision for pi
-mpmath.mp.dps = 1000
-pi_val = str(mpmath.mp.pi)[2:]  # remove "3."
+from pi_digits import digits
+
+try:
+    from PIL import Image, ImageDraw, ImageTk
+except ImportError:  # --raster needs Pillow; plain canvas lines work without it
+    Image = None
+
+parser = argparse.ArgumentParser(description="Animate the digit-to-digit thread of pi")
+parser.add_argument("count", type=int, nargs="?", default=1000,
+                    help="digits after the decimal point to animate")
+parser.add_argument("--speed", type=int, default=16,
+                    help="digit transitions drawn per frame (+/- change it while running)")
+parser.add_argument("--fps", type=int, default=60, help="frames per second to aim for")
+parser.add_argument("--raster", action="store_true",
+                    help="draw the thread into a Pillow image, shading pairs by how often they occur")
+args = parser.parse_args()
+if args.raster and Image is None:
+    print("--raster needs Pillow; drawing canvas lines instead")
+    args.raster = False
 
 # Define special colors for each digit 0-9
 digit_colors = {
@@ -39,32 +57,119 @@ for i in range(10):
     y = center_y + radius * math.sin(angle)
     positions[str(i)] = (x, y)
     # Draw digit circle
-    canvas.create_oval(x-20, y-20, x+20, y+20, fill='lightgrey')
+    canvas.create_oval(x-20, y-20, x+20, y+20, fill='lightgrey', tags='digit')
     # Draw digit text
-    canvas.create_text(x, y, text=str(i), font=('Helvetica', 16, 'bold'))
+    canvas.create_text(x, y, text=str(i), font=('Helvetica', 16, 'bold'), tags='digit')
+
+status = canvas.create_text(8, canvas_size - 8, anchor='sw', font=('Helvetica', 9))
 
-# Variables to track animation and lines
+# How often each (from, to) pair has come up; the canvas keeps one line per
+# pair, or one image in raster mode, however many digits have gone by
+counts = {}
+pair_lines = {}
+line_widths = {}
+# The most recent transition, drawn on top in black
+latest = canvas.create_line(0, 0, 0, 0, fill='black', width=2, state='hidden')
+
+if args.raster:
+    backing = Image.new('RGBA', (canvas_size, canvas_size), (255, 255, 255, 0))
+    photo = ImageTk.PhotoImage(backing)
+    canvas.tag_lower(canvas.create_image(0, 0, anchor='nw', image=photo))
+
+# Variables to track animation
 index = 0
-lines_drawn = []
+speed = args.speed
+paused = False
+
+
+def pair_width(count, most):
+    # Half-pixel steps, so most frames leave most widths alone
+    return round(2 + 10 * count / most) / 2
+
+
+def update_lines(changed, most, rescale):
+    # Canvas items only exist per pair; widths follow each pair's share of
+    # the most common one, and only items whose width moved are touched
+    for pair in (counts if rescale else changed):
+        width = pair_width(counts[pair], most)
+        line = pair_lines.get(pair)
+        if line is None:
+            (x1, y1), (x2, y2) = positions[pair[0]], positions[pair[1]]
+            line = pair_lines[pair] = canvas.create_line(
+                x1, y1, x2, y2, fill=digit_colors[pair[0]], width=width)
+            # New lines go on top; keep the latest transition and the
+            # digits above them
+            canvas.tag_raise(latest)
+            canvas.tag_raise('digit')
+        elif line_widths.get(pair) != width:
+            canvas.itemconfigure(line, width=width)
+        line_widths[pair] = width
+
+
+def update_raster(most):
+    # Redraw the ~90 pair lines into the backing image, more opaque the more
+    # often a pair occurs, which canvas lines can't show
+    backing.paste((255, 255, 255, 0), (0, 0, canvas_size, canvas_size))
+    draw = ImageDraw.Draw(backing)
+    for pair, count in sorted(counts.items(), key=lambda item: item[1]):
+        color = digit_colors[pair[0]]
+        rgb = tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+        alpha = int(40 + 215 * count / most)
+        draw.line(positions[pair[0]] + positions[pair[1]], fill=rgb + (alpha,),
+                  width=max(1, int(pair_width(count, most))))
+    photo.paste(backing)
 
-def draw_thread():
+
+def draw_frame():
     global index
-    if index >= len(pi_val) - 1:
+    started = time.perf_counter()
+    end = min(index + speed, args.count - 1)
+    if not paused and index < end:
+        stream = digits(index, end - index + 1)
+        changed = set()
+        old_most = max(counts.values(), default=1)
+        for pair, count in Counter(zip(stream, stream[1:])).items():
+            if pair[0] == pair[1]:
+                continue
+            counts[pair] = counts.get(pair, 0) + count
+            changed.add(pair)
+        index = end
+
+        if changed:
+            most = max(counts.values())
+            if args.raster:
+                update_raster(most)
+            else:
+                update_lines(changed, most, rescale=most != old_most)
+        (x1, y1), (x2, y2) = positions[stream[-2]], positions[stream[-1]]
+        canvas.coords(latest, x1, y1, x2, y2)
+        canvas.itemconfigure(latest, state='normal')
+
+    if index >= args.count - 1:
+        # Every digit is drawn; stop scheduling frames
+        canvas.itemconfigure(status, text=f"{args.count} / {args.count} digits, done")
         return
-    
-    current_digit = pi_val[index]
-    next_digit = pi_val[index + 1]
-    start_pos = positions[current_digit]
-    end_pos = positions[next_digit]
-
-    # Draw line with color based on current digit
-    color = digit_colors.get(current_digit, 'black')
-    line = canvas.create_line(start_pos[0], start_pos[1], end_pos[0], end_pos[1], fill=color, width=2)
-    lines_drawn.append(line)
-
-    index += 1
-    # Schedule next step
-    root.after(1, draw_thread)
-
-draw_thread()
+    state = "paused" if paused else f"{speed} per frame"
+    canvas.itemconfigure(status, text=f"{index + 1} / {args.count} digits, {state}  (+/- speed, space pause)")
+    # Schedule the next frame so frames start at a steady rate, whatever this one cost
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    root.after(max(1, int(1000 / args.fps - elapsed_ms)), draw_frame)
+
+
+def change_speed(factor):
+    global speed
+    speed = max(1, min(int(speed * factor) or 1, 1000000))
+
+
+def toggle_pause():
+    global paused
+    paused = not paused
+
+
+root.bind('+', lambda e: change_speed(2))
+root.bind('=', lambda e: change_speed(2))
+root.bind('-', lambda e: change_speed(0.5))
+root.bind('<space>', lambda e: toggle_pause())
+
+draw_frame()
 root.mainloop()
@@ -0,0 +1,270 @@
+"""Digits of pi, computed once and cached on disk.
+
+Digits come from the Chudnovsky series, summed by binary splitting, and
+are saved to a cache file of plain ASCII digits (the ones after "3.").
+Later runs map that file and slice it, so asking for a million digits is
+instant once they have been computed. Asking for more than the cache
+holds recomputes a larger cache, at least twice the old size.
+
+Large caches are best filled from the command line, which splits the
+series across a process pool:
+
+    python pi_digits.py 10000000               # fill the cache, all cores
+    python pi_digits.py 1000000 --bench        # digits/s against core count
+"""
+import argparse
+import decimal
+import math
+import mmap
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pi_digits.txt")
+
+# Each Chudnovsky term adds about 14.18 digits
+DIGITS_PER_TERM = 14.181647462725477
+C3_OVER_24 = 640320 ** 3 // 24
+# Ranges this short are summed with ints; above it, P, Q and T are big
+# enough that decimal's multiplication beats int's
+LEAF_TERMS = 64
+# Extra digits computed and thrown away, so rounding never reaches the
+# digits we keep
+GUARD_DIGITS = 20
+
+
+def _exact_context() -> decimal.Context:
+    # Integer arithmetic that never rounds
+    return decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX,
+                           Emin=decimal.MIN_EMIN)
+
+
+def _split_ints(a: int, b: int):
+    if b - a == 1:
+        if a == 0:
+            p = q = 1
+        else:
+            p = (6 * a - 5) * (2 * a - 1) * (6 * a - 1)
+            q = a * a * a * C3_OVER_24
+        t = p * (13591409 + 545140134 * a)
+        return p, q, -t if a & 1 else t
+    m = (a + b) // 2
+    p1, q1, t1 = _split_ints(a, m)
+    p2, q2, t2 = _split_ints(m, b)
+    return p1 * p2, q1 * q2, q2 * t1 + p1 * t2
+
+
+def merge(left, right, need_p: bool = True):
+    """P, Q and T for two adjacent term ranges joined into one.
+
+    The final merge can skip P, the largest product, since pi only needs
+    Q and T.
+    """
+    p1, q1, t1 = left
+    p2, q2, t2 = right
+    with decimal.localcontext(_exact_context()):
+        return p1 * p2 if need_p else None, q1 * q2, q2 * t1 + p1 * t2
+
+
+def split_terms(a: int, b: int):
+    """P, Q and T for Chudnovsky terms [a, b), as exact Decimals.
+
+    Call with an exact context (see :func:`_exact_context`) active.
+    """
+    if b - a <= LEAF_TERMS:
+        return tuple(decimal.Decimal(x) for x in _split_ints(a, b))
+    m = (a + b) // 2
+    p1, q1, t1 = split_terms(a, m)
+    p2, q2, t2 = split_terms(m, b)
+    return p1 * p2, q1 * q2, q2 * t1 + p1 * t2
+
+
+def _sqrt(n: int, digits: int) -> decimal.Decimal:
+    # Newton's method, doubling the precision each step; decimal's own
+    # sqrt is far slower at millions of digits
+    context = decimal.getcontext()
+    x = decimal.Decimal(math.sqrt(n))
+    precision = 15
+    while precision < digits:
+        precision = min(2 * precision, digits)
+        context.prec = precision + 10
+        x = (x + decimal.Decimal(n) / x) / 2
+    return x
+
+
+def terms_for(count: int) -> int:
+    return int((count + GUARD_DIGITS) / DIGITS_PER_TERM) + 2
+
+
+def _split_range(bounds):
+    with decimal.localcontext(_exact_context()):
+        return split_terms(*bounds)
+
+
+def _merge_pair(pair):
+    return merge(*pair)
+
+
+def _root(count: int) -> decimal.Decimal:
+    with decimal.localcontext(_exact_context()):
+        return _sqrt(10005, count + GUARD_DIGITS)
+
+
+def finish(q: decimal.Decimal, t: decimal.Decimal, count: int,
+           root: decimal.Decimal = None) -> str:
+    """The first ``count`` digits after "3." from the summed series."""
+    if root is None:
+        root = _root(count)
+    with decimal.localcontext(_exact_context()) as context:
+        context.prec = count + GUARD_DIGITS
+        pi = q * 426880 * root / t
+        return str(pi)[2:count + 2]
+
+
+def compute(count: int, workers: int = 1) -> str:
+    """The first ``count`` digits of pi after "3.", computed from scratch.
+
+    With ``workers`` above 1 the series is split into term ranges summed in
+    a process pool, and their P/Q/T products are merged pairwise there too,
+    while another worker computes sqrt(10005). Only the last merge and the
+    final division run alone.
+    """
+    terms = terms_for(count)
+    if workers <= 1 or terms < 2 * LEAF_TERMS * workers:
+        with decimal.localcontext(_exact_context()):
+            _, q, t = split_terms(0, terms)
+        return finish(q, t, count)
+
+    # Later terms are bigger, so more ranges than workers keeps them all busy
+    chunks = 4 * workers
+    bounds = [(terms * i // chunks, terms * (i + 1) // chunks) for i in range(chunks)]
+    with ProcessPoolExecutor(workers) as pool:
+        root = pool.submit(_root, count)
+        parts = list(pool.map(_split_range, bounds))
+        while len(parts) > 2:
+            pairs = list(zip(parts[0::2], parts[1::2]))
+            merged = list(pool.map(_merge_pair, pairs))
+            parts = merged + parts[2 * len(pairs):]
+        _, q, t = merge(parts[0], parts[1], need_p=False)
+        return finish(q, t, count, root.result())
+
+
+class DigitCache:
+    """Digits of pi after "3.", kept in ``path`` and read through mmap."""
+
+    def __init__(self, path: str = CACHE_FILE, workers: int = 1):
+        self.path = path
+        # Scripts use the default of 1: a process pool re-imports the main
+        # module on platforms without fork, which would rerun a Tk script
+        self.workers = workers
+        self._file = None
+        self._map = None
+        self._open()
+
+    def _open(self):
+        self.close()
+        try:
+            self._file = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self._map) if self._map is not None else 0
+
+    def ensure(self, count: int):
+        """Make sure at least ``count`` digits are cached."""
+        if count <= len(self):
+            return
+        # Another script may have grown the cache since we opened it
+        self._open()
+        if count <= len(self):
+            return
+        digits = compute(max(count, 2 * len(self)), self.workers)
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_file = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(digits.encode("ascii"))
+            os.chmod(tmp_file, 0o644)
+            os.replace(tmp_file, self.path)
+        except BaseException:
+            os.remove(tmp_file)
+            raise
+        self._open()
+
+    def digits(self, start: int, count: int) -> str:
+        """``count`` digits starting ``start`` places after the decimal point."""
+        self.ensure(start + count)
+        return self._map[start:start + count].decode("ascii")
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+_cache = None
+
+
+def _default_cache() -> DigitCache:
+    global _cache
+    if _cache is None:
+        _cache = DigitCache()
+    return _cache
+
+
+def digits(start: int, count: int) -> str:
+    """``count`` digits of pi starting ``start`` places after "3."."""
+    return _default_cache().digits(start, count)
+
+
+def pi_string(count: int) -> str:
+    """Pi as "3." followed by ``count`` decimal places."""
+    return "3." + digits(0, count)
+
+
+def benchmark(count: int, max_workers: int):
+    """Time computing ``count`` digits with 1, 2, 4, ... up to ``max_workers``."""
+    workers = [1]
+    while workers[-1] * 2 <= max_workers:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != max_workers:
+        workers.append(max_workers)
+
+    print(f"{'workers':>7}  {'seconds':>8}  {'digits/s':>10}  speedup")
+    baseline = None
+    for n in workers:
+        start = time.perf_counter()
+        compute(count, n)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{n:>7}  {elapsed:>8.2f}  {count / elapsed:>10.0f}  {baseline / elapsed:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute and cache digits of pi")
+    parser.add_argument("count", type=int, nargs="?", default=1000000,
+                        help="digits after the decimal point")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes to split the series across")
+    parser.add_argument("--bench", action="store_true",
+                        help="report digits/s for 1 worker up to --workers, without caching")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.count, args.workers)
+        return
+    start = time.perf_counter()
+    cache = DigitCache(workers=args.workers)
+    cache.ensure(args.count)
+    print(f"{len(cache)} digits cached in {cache.path} ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
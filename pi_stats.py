@@ -0,0 +1,197 @@
+"""Statistics of a stream of pi digits, computed chunk by chunk with NumPy.
+
+Reads a file of ASCII digits (pi_digits.txt by default; bytes that aren't
+0-9, such as a decimal point or newlines, are skipped) a chunk at a time,
+so a file of any size is analyzed in bounded memory:
+
+    python pi_stats.py                       # the digit cache
+    python pi_stats.py digits.txt --chunk-mb 16
+    python pi_stats.py --count 1000000       # fill the cache to 1M first
+"""
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+
+from pi_digits import CACHE_FILE, DigitCache
+
+
+def chi2_sf(x: float, dof: int) -> float:
+    """P(X >= x) for a chi-square variable with integer ``dof``."""
+    if x <= 0:
+        return 1.0
+    half = x / 2
+    if dof % 2 == 0:
+        # exp(-x/2) * sum of (x/2)^i / i! for i < dof/2
+        term = total = math.exp(-half)
+        for i in range(1, dof // 2):
+            term *= half / i
+            total += term
+        return min(total, 1.0)
+    root = math.sqrt(x)
+    term = math.sqrt(2 / math.pi) * root * math.exp(-half)
+    total = math.erfc(root / math.sqrt(2))
+    for i in range(1, (dof + 1) // 2):
+        total += term
+        term *= x / (2 * i + 1)
+    return min(total, 1.0)
+
+
+def chi_square(observed: np.ndarray) -> float:
+    expected = observed.sum() / observed.size
+    return float(((observed - expected) ** 2 / expected).sum()) if expected else 0.0
+
+
+class DigitStats:
+    """Running digit statistics, fed one chunk of digits (0-9) at a time.
+
+    What crosses a chunk boundary is carried over: the last digit, so the
+    transition into the next chunk is counted, and the run of equal digits
+    still open at the end of the chunk.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.frequencies = np.zeros(10, dtype=np.int64)
+        # transitions[a, b]: how often digit b follows digit a, as in the
+        # pi3.py circle
+        self.transitions = np.zeros((10, 10), dtype=np.int64)
+        # run_lengths[n]: runs of exactly n equal digits
+        self.run_lengths = np.zeros(2, dtype=np.int64)
+        self.longest = (0, None, None)  # length, digit, position
+        self._last = None
+        self._run = None  # digit, length, start of the open run
+
+    def update(self, digits: np.ndarray):
+        if not len(digits):
+            return
+        self.frequencies += np.bincount(digits, minlength=10)
+
+        if self._last is not None:
+            self.transitions[self._last, digits[0]] += 1
+        pairs = digits[:-1] * np.uint8(10) + digits[1:]
+        self.transitions += np.bincount(pairs, minlength=100).reshape(10, 10)
+
+        starts = np.flatnonzero(np.concatenate(([True], digits[1:] != digits[:-1])))
+        lengths = np.diff(np.append(starts, len(digits)))
+        positions = starts + self.count
+        if self._run is not None:
+            digit, length, start = self._run
+            if digit == digits[0]:
+                lengths[0] += length
+                positions[0] = start
+            else:
+                self._close_runs(np.array([length]), np.array([start]), digit)
+        # The last run may continue into the next chunk
+        self._close_runs(lengths[:-1], positions[:-1], digits[starts[:-1]])
+        self._run = (digits[-1], int(lengths[-1]), int(positions[-1]))
+
+        self._last = digits[-1]
+        self.count += len(digits)
+
+    def _close_runs(self, lengths: np.ndarray, positions: np.ndarray, digits):
+        if not len(lengths):
+            return
+        longest = int(lengths.max())
+        if longest >= len(self.run_lengths):
+            self.run_lengths = np.concatenate(
+                (self.run_lengths, np.zeros(longest + 1 - len(self.run_lengths), dtype=np.int64)))
+        self.run_lengths += np.bincount(lengths, minlength=len(self.run_lengths))
+        if longest > self.longest[0]:
+            i = int(np.argmax(lengths))
+            digit = digits if np.isscalar(digits) else digits[i]
+            self.longest = (longest, int(digit), int(positions[i]))
+
+    def finish(self):
+        """Count the run still open at the end of the stream."""
+        if self._run is not None:
+            digit, length, start = self._run
+            self._close_runs(np.array([length]), np.array([start]), digit)
+            self._run = None
+
+    def report(self) -> dict:
+        frequency_chi2 = chi_square(self.frequencies)
+        transition_chi2 = chi_square(self.transitions)
+        return {
+            "digits": self.count,
+            "frequencies": self.frequencies.tolist(),
+            "frequency_chi2": frequency_chi2,
+            "frequency_p": chi2_sf(frequency_chi2, 9),
+            "transitions": self.transitions.tolist(),
+            "transition_chi2": transition_chi2,
+            "transition_p": chi2_sf(transition_chi2, 99),
+            "run_lengths": {n: int(c) for n, c in enumerate(self.run_lengths) if c},
+            "longest_run": dict(zip(("length", "digit", "position"), self.longest)),
+        }
+
+
+def digit_chunks(path: str, chunk_size: int = 4 << 20):
+    """The digits in ``path`` as uint8 arrays of at most ``chunk_size``.
+
+    Each array is a view of one reused buffer, valid until the next one.
+    """
+    buffer = bytearray(chunk_size)
+    with open(path, 'rb') as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            values = np.frombuffer(buffer, dtype=np.uint8, count=size) - ord('0')
+            # Anything that isn't a digit wrapped around to 10 or more
+            yield values if values.max() < 10 else values[values < 10]
+
+
+def analyze(path: str = CACHE_FILE, chunk_size: int = 4 << 20) -> DigitStats:
+    stats = DigitStats()
+    for digits in digit_chunks(path, chunk_size):
+        stats.update(digits)
+    stats.finish()
+    return stats
+
+
+def format_report(report: dict) -> str:
+    lines = [f"{report['digits']} digits"]
+    lines.append("")
+    lines.append("digit   count   share")
+    for digit, count in enumerate(report["frequencies"]):
+        share = count / report["digits"] if report["digits"] else 0.0
+        lines.append(f"{digit:>5} {count:>7} {share:>7.4f}")
+    lines.append(f"chi-square {report['frequency_chi2']:.3f} (9 dof), p = {report['frequency_p']:.4f}")
+    lines.append("")
+    lines.append("transitions (row: digit, column: next digit)")
+    lines.append("     " + "".join(f"{digit:>8}" for digit in range(10)))
+    for digit, row in enumerate(report["transitions"]):
+        lines.append(f"{digit:>5}" + "".join(f"{count:>8}" for count in row))
+    lines.append(f"chi-square {report['transition_chi2']:.3f} (99 dof), p = {report['transition_p']:.4f}")
+    lines.append("")
+    lines.append("runs of equal digits: " + ", ".join(
+        f"{length}: {count}" for length, count in report["run_lengths"].items()))
+    longest = report["longest_run"]
+    if longest["length"]:
+        lines.append(f"longest: {longest['length']} x {longest['digit']} "
+                     f"starting at digit {longest['position']} of the file")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Digit statistics for a file of pi digits")
+    parser.add_argument("path", nargs="?", default=CACHE_FILE)
+    parser.add_argument("--count", type=int,
+                        help="make sure the digit cache holds this many digits first")
+    parser.add_argument("--chunk-mb", type=int, default=4,
+                        help="megabytes of digits read at a time; memory use is about 25x this")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if args.count:
+        cache = DigitCache(args.path, workers=os.cpu_count() or 1)
+        cache.ensure(args.count)
+        cache.close()
+    report = analyze(args.path, args.chunk_mb << 20).report()
+    print(json.dumps(report) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+
+from grocery.core import GroceryTracker
+from grocery.snapshot import SnapshotStore
+from grocery.storage import SQLiteStore
+
+STORAGES = ("json", "journal", "sqlite", "snapshot")
+
+
+def quantities(tracker: GroceryTracker) -> dict:
+    return {item: details.quantity for item, details in tracker.inventory.items()}
+
+
+class TempDirTestCase(unittest.TestCase):
+    """Runs each test in a fresh temporary directory."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = self._tmp.name
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+
+    def use_subdir(self, name: str):
+        self.dir = os.path.join(self._tmp.name, name)
+        os.makedirs(self.dir)
+
+    def open_tracker(self, storage: str, **kwargs) -> GroceryTracker:
+        data_file = self.path("groceries.json")
+        kwargs.setdefault("history", False)
+        if storage == "sqlite":
+            return GroceryTracker(store=SQLiteStore(self.path("groceries.db")), **kwargs)
+        if storage == "snapshot":
+            return GroceryTracker(store=SnapshotStore(data_file), **kwargs)
+        return GroceryTracker(data_file, journal=storage == "journal", **kwargs)
@@ -0,0 +1,17 @@
+import unittest
+
+from grocery.categories import CategoryClassifier
+from grocery.core import CATEGORY_KEYWORDS
+
+
+class CategoryClassifierTest(unittest.TestCase):
+    def test_classify(self):
+        classifier = CategoryClassifier(CATEGORY_KEYWORDS)
+        self.assertEqual(classifier.classify("green apples"), "produce")
+        self.assertEqual(classifier.classify("vanilla ice cream"), "frozen")
+        self.assertEqual(classifier.classify("sour cream"), "dairy")
+        self.assertEqual(classifier.classify("lamp oil"), "uncategorized")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+import unittest
+
+from grocery.commands import CommandRouter
+
+
+class CommandRouterTest(unittest.TestCase):
+    def test_route(self):
+        router = CommandRouter(lambda message: "fallback")
+        router.register("add", lambda args: "add:" + args)
+        router.register(["check expiring", "expiring"], lambda args: "expiring:" + args)
+
+        self.assertEqual(router.route("Add 3 apples")[0], "add")
+        self.assertEqual(router.dispatch("add 3 apples"), "add:3 apples")
+        self.assertEqual(router.dispatch("check expiring soon"), "expiring:soon")
+        self.assertEqual(router.dispatch("expiring?"), "expiring:")
+        self.assertEqual(router.route("hello there"), ("", router.fallback, "hello there"))
+
+
+if __name__ == "__main__":
+    unittest.main()
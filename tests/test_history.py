@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+from grocery.history import RECORD, EventLog
+from tests.support import TempDirTestCase
+
+
+class EventLogTest(TempDirTestCase):
+    def test_keeps_recent_events(self):
+        path = self.path("groceries.json.events")
+        log = EventLog(path)
+        now = time.time()
+        log.record("apple", "produce", 5, now - 400 * 86400)
+        log.record("apple", "produce", -1, now - 10)
+        log.flush()
+        with open(path, 'ab') as f:
+            f.write(b"\0" * (RECORD.size // 2))
+
+        log = EventLog(path)
+        self.assertEqual(list(log.delta), [-1])
+        self.assertEqual(os.path.getsize(path), RECORD.size)
+        self.assertEqual(list(EventLog(path, retention_days=None).delta), [-1])
+
+    def test_writers_sharing_a_log_keep_their_names(self):
+        path = self.path("groceries.json.events")
+        first, second = EventLog(path), EventLog(path)
+        first.record("apple", "produce", 2)
+        second.record("pear", "produce", 1)
+        second.record("apple", "produce", 5)
+        first.flush()
+        second.flush()
+        first.record("kiwi", "produce", 3)
+        first.flush()
+
+        log = EventLog(path)
+        self.assertEqual([(log.names[item], delta) for item, delta in zip(log.item, log.delta)],
+                         [("apple", 2), ("pear", 1), ("apple", 5), ("kiwi", 3)])
+        self.assertEqual(log.names, ["apple", "pear", "kiwi"])
+
+    def test_starting_a_bot_does_not_import_numpy(self):
+        code = "import sys, grocery.core; print('numpy' in sys.modules)"
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, "-c", code], cwd=root,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "False")
+
+    @unittest.skipUnless(EventLog.analytics, "needs NumPy")
+    def test_burn_rates(self):
+        log = EventLog()
+        now = time.time()
+        log.record("apple", "produce", 10, now - 10 * 86400)
+        log.record("apple", "produce", -4, now - 5 * 86400)
+        log.record("pear", "produce", 3, now - 86400)
+        # Apple was first seen ten days ago, so it is rated over those ten
+        self.assertEqual(list(log.burn_rates(days=20, now=now)), [0.4, 0.0])
+        self.assertEqual(log.run_out({"apple": 6, "pear": 3}, days=20, now=now)[0][0], "apple")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import datetime
+import unittest
+
+from grocery.index import CategoryIndex, ExpiryIndex
+
+
+def day(n: int) -> datetime.date:
+    return datetime.date(2030, 1, n)
+
+
+class ExpiryIndexTest(unittest.TestCase):
+    def test_between_includes_both_bounds(self):
+        index = ExpiryIndex()
+        for n, item in enumerate(["a", "b", "c", "d", "e"], start=1):
+            index.add(item, day(n).toordinal())
+        index.add("undated", None)
+
+        self.assertEqual(index.between(day(2), day(4)),
+                         [("b", day(2)), ("c", day(3)), ("d", day(4))])
+        self.assertEqual(index.between(day(3), day(3)), [("c", day(3))])
+        self.assertEqual(index.between(day(6), day(9)), [])
+        self.assertEqual(len(index), 5)
+
+    def test_readd_and_discard(self):
+        index = ExpiryIndex()
+        index.add("milk", day(1).toordinal())
+        index.add("milk", day(5).toordinal())
+        index.add("eggs", day(5).toordinal())
+        self.assertEqual(index.between(day(1), day(5)), [("eggs", day(5)), ("milk", day(5))])
+        index.discard("milk")
+        index.discard("milk")
+        self.assertEqual(index.between(day(1), day(5)), [("eggs", day(5))])
+
+
+class CategoryIndexTest(unittest.TestCase):
+    def test_change_invalidates_only_its_category(self):
+        index = CategoryIndex()
+        index.set("apple", "produce", 2)
+        index.set("milk", "dairy", 1)
+        self.assertEqual(index.render(),
+                         "\nProduce:\n  - apple (2)\n\nDairy:\n  - milk (1)\n")
+        dairy = index._sections["dairy"]
+
+        index.set("apple", "produce", 3)
+        self.assertNotIn("produce", index._sections)
+        self.assertIs(index._sections["dairy"], dairy)
+        self.assertIn("apple (3)", index.render())
+        self.assertIs(index.render(), index.render())
+
+    def test_move_between_categories(self):
+        index = CategoryIndex()
+        index.set("apple", "produce", 2)
+        index.set("pear", "produce", 1)
+        index.set("cheese", "dairy", 1)
+        index.render()
+
+        index.set("apple", "snacks", 2)
+        self.assertNotIn("produce", index._sections)
+        self.assertIn("dairy", index._sections)
+        self.assertEqual(index.totals(), {"produce": 1, "dairy": 1, "snacks": 2})
+        self.assertEqual(index.render(), "\nProduce:\n  - pear (1)\n"
+                                         "\nDairy:\n  - cheese (1)\n"
+                                         "\nSnacks:\n  - apple (2)\n")
+
+        index.discard("cheese")
+        self.assertEqual(index.totals(), {"produce": 1, "snacks": 2})
+        self.assertNotIn("Dairy", index.render())
+        self.assertEqual(len(index), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
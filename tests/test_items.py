@@ -0,0 +1,31 @@
+import unittest
+
+from grocery.items import Item, decode_added, decode_expiry, encode_added, encode_expiry
+
+
+class EncodingTest(unittest.TestCase):
+    def test_added_round_trip(self):
+        for added in ("2025-03-01T12:30:45.123456", "2025-03-01T12:30:45",
+                      "2025-03-01T12:30:45+02:00", "2025-03-01 12:30:45",
+                      "yesterday", "", None):
+            with self.subTest(added=added):
+                self.assertEqual(decode_added(encode_added(added)), added)
+        self.assertIsInstance(encode_added("2025-03-01T12:30:45"), int)
+        self.assertIsInstance(encode_added("2025-03-01 12:30:45"), str)
+
+    def test_expiry_round_trip(self):
+        for expiry in ("2025-12-25", "2025-1-5", "20251225", "next week", "", None):
+            with self.subTest(expiry=expiry):
+                self.assertEqual(decode_expiry(encode_expiry(expiry)), expiry)
+        self.assertIsInstance(encode_expiry("2025-12-25"), int)
+        self.assertIsInstance(encode_expiry("20251225"), str)
+
+    def test_item_dict_round_trip(self):
+        details = {"quantity": 2, "category": "dairy",
+                   "added_date": "2025-03-01 08:00", "expiry_date": "soon"}
+        self.assertEqual(Item.from_dict(details).to_dict(), details)
+        self.assertEqual(Item.from_dict(details), Item.from_dict(dict(details)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from grocery.matching import NameIndex, name_variants
+from tests.support import STORAGES, TempDirTestCase, quantities
+
+
+class NameMatchingTest(unittest.TestCase):
+    def test_name_matching(self):
+        index = NameIndex()
+        for name in ("apple", "tomatoes", "whole milk"):
+            index.add(name)
+        self.assertEqual(index.find("apples"), "apple")
+        self.assertEqual(index.find("tomato"), "tomatoes")
+        self.assertEqual(index.find("whole mlik"), "whole milk")
+        self.assertIsNone(index.find("whole mlik", fuzzy=False))
+        self.assertIsNone(index.find("bread"))
+        self.assertIsNone(index.find("apple pie"))
+        for name in ("it10", "it11"):
+            index.add(name)
+        self.assertIsNone(index.find("it1"))
+        self.assertEqual(name_variants("berries"), ["berry", "berrys", "berries"])
+        self.assertIn("tomatoes", name_variants("tomato"))
+
+
+class RemoveTest(TempDirTestCase):
+    def test_remove_only_exact_names_and_plurals(self):
+        for storage in STORAGES:
+            with self.subTest(storage=storage):
+                self.use_subdir(storage)
+                tracker = self.open_tracker(storage, fuzzy_index=True)
+                for name in ("apple", "whole milk", "it10", "it11"):
+                    tracker.add_item(name, 2)
+
+                self.assertEqual(tracker.remove_item("apples", 1), "Removed 1 apple(s). 1 remaining.")
+                self.assertEqual(tracker.remove_item("whole mlik"),
+                                 "whole mlik not found in inventory. Did you mean whole milk?")
+                self.assertEqual(tracker.remove_item("apple pie"), "apple pie not found in inventory.")
+                self.assertEqual(tracker.remove_item("it1"), "it1 not found in inventory.")
+                self.assertEqual(quantities(tracker),
+                                 {"apple": 1, "whole milk": 2, "it10": 2, "it11": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
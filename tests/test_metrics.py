@@ -0,0 +1,51 @@
+import io
+import json
+import unittest
+
+from grocery.metrics import Metrics
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics(enabled=True)
+        self.metrics.inc("grocery_commands_total", verb="add", outcome="ok")
+        # Same series with its labels given in another order
+        self.metrics.inc("grocery_commands_total", outcome="ok", verb="add")
+        self.metrics.observe("grocery_command_seconds", 0.003, verb="add")
+        self.metrics.observe("grocery_command_seconds", 20.0, verb="add")
+
+    def test_prometheus(self):
+        lines = self.metrics.prometheus().splitlines()
+        self.assertIn("# TYPE grocery_commands_total counter", lines)
+        self.assertIn('grocery_commands_total{outcome="ok",verb="add"} 2', lines)
+        self.assertIn("# TYPE grocery_command_seconds histogram", lines)
+        self.assertIn('grocery_command_seconds_bucket{verb="add",le="0.0025"} 0', lines)
+        self.assertIn('grocery_command_seconds_bucket{verb="add",le="0.005"} 1', lines)
+        self.assertIn('grocery_command_seconds_bucket{verb="add",le="10.0"} 1', lines)
+        self.assertIn('grocery_command_seconds_bucket{verb="add",le="+Inf"} 2', lines)
+        self.assertIn('grocery_command_seconds_sum{verb="add"} 20.003', lines)
+        self.assertIn('grocery_command_seconds_count{verb="add"} 2', lines)
+
+    def test_jsonl(self):
+        f = io.StringIO()
+        self.metrics.write_jsonl(f, timestamp=1.0)
+        counter, histogram = [json.loads(line) for line in f.getvalue().splitlines()]
+        self.assertEqual(counter, {"time": 1.0, "name": "grocery_commands_total",
+                                   "type": "counter", "labels": {"outcome": "ok", "verb": "add"},
+                                   "value": 2})
+        self.assertEqual(histogram["labels"], {"verb": "add"})
+        self.assertEqual(histogram["count"], 2)
+        self.assertEqual(sum(histogram["counts"]), 2)
+        self.assertEqual(histogram["counts"][-1], 1)
+
+    def test_disabled_records_nothing(self):
+        metrics = Metrics()
+        metrics.inc("grocery_commands_total", verb="add")
+        with metrics.timer("grocery_command_seconds", verb="add"):
+            pass
+        self.assertEqual(metrics.prometheus(), "")
+        self.assertEqual(list(metrics.records()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import unittest
+
+import pi_digits
+from tests.support import TempDirTestCase
+
+# The first 50 decimal places of pi
+PI_50 = "14159265358979323846264338327950288419716939937510"
+
+
+class ComputeTest(unittest.TestCase):
+    def test_prefix_digits(self):
+        for count in (1, 10, 50):
+            with self.subTest(count=count):
+                self.assertEqual(pi_digits.compute(count), PI_50[:count])
+        # More terms than one leaf range, and still the same prefix
+        self.assertTrue(pi_digits.compute(2000).startswith(PI_50))
+
+    def test_parallel_matches_serial(self):
+        # Enough terms that two workers really split the series
+        count = 5000
+        self.assertGreaterEqual(pi_digits.terms_for(count), 2 * pi_digits.LEAF_TERMS * 2)
+        self.assertEqual(pi_digits.compute(count, workers=2), pi_digits.compute(count))
+
+
+class DigitCacheTest(TempDirTestCase):
+    def test_digits_grow_the_cache(self):
+        path = self.path("pi_digits.txt")
+        cache = pi_digits.DigitCache(path)
+        self.addCleanup(cache.close)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.digits(10, 20), PI_50[10:30])
+        self.assertEqual(os.path.getsize(path), 30)
+        self.assertEqual(cache.digits(25, 25), PI_50[25:])
+        self.assertEqual(len(cache), 60)
+
+        reopened = pi_digits.DigitCache(path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.digits(0, 50), PI_50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import random
+import unittest
+
+from tests.support import TempDirTestCase
+
+try:
+    import pi_stats
+except ImportError:  # pi_stats needs NumPy
+    pi_stats = None
+
+
+def naive_report(digits: str) -> dict:
+    frequencies = [digits.count(str(d)) for d in range(10)]
+    transitions = [[0] * 10 for _ in range(10)]
+    for a, b in zip(digits, digits[1:]):
+        transitions[int(a)][int(b)] += 1
+    run_lengths = {}
+    longest = {"length": 0, "digit": None, "position": None}
+    start = 0
+    for i in range(1, len(digits) + 1):
+        if i == len(digits) or digits[i] != digits[start]:
+            length = i - start
+            run_lengths[length] = run_lengths.get(length, 0) + 1
+            if length > longest["length"]:
+                longest = {"length": length, "digit": int(digits[start]), "position": start}
+            start = i
+    return {"digits": len(digits), "frequencies": frequencies, "transitions": transitions,
+            "run_lengths": dict(sorted(run_lengths.items())), "longest_run": longest}
+
+
+@unittest.skipIf(pi_stats is None, "needs NumPy")
+class DigitStatsTest(TempDirTestCase):
+    def test_chunks_match_a_naive_count(self):
+        # Few distinct digits, so runs are long and often cross chunks
+        rng = random.Random(7)
+        digits = "".join(rng.choice("0119") for _ in range(3000)) + "5" * 40
+        path = self.path("digits.txt")
+        with open(path, 'w') as f:
+            # Non-digits, like these newlines, are skipped
+            f.write(digits[:1000] + "\n" + digits[1000:] + "\n")
+
+        expected = naive_report(digits)
+        for chunk_size in (1, 2, 7, 64, 4096):
+            with self.subTest(chunk_size=chunk_size):
+                report = pi_stats.analyze(path, chunk_size).report()
+                self.assertEqual({key: report[key] for key in expected}, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
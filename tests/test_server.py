@@ -0,0 +1,79 @@
+import asyncio
+import json
+import unittest
+
+from grocery.core import GroceryChatbot
+from grocery.metrics import metrics
+from grocery.server import GroceryServer
+from tests.support import TempDirTestCase
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data: bytes):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ServerTest(TempDirTestCase):
+    def route(self, server: GroceryServer, method: str, target: str, payload):
+        return asyncio.run(server._route(method, target, {}, json.dumps(payload).encode()))
+
+    def request(self, server: GroceryServer, method: str, target: str, body: bytes) -> bytes:
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(f"{method} {target} HTTP/1.1\r\nConnection: close\r\n"
+                             f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            reader.feed_eof()
+            writer = RecordingWriter()
+            await server._handle(reader, writer)
+            return writer.data
+        return asyncio.run(run())
+
+    def test_batch(self):
+        server = GroceryServer(GroceryChatbot(self.open_tracker("json")))
+        status, body = self.route(server, "POST", "/batch", {"messages": ["add 2 milk", "list"]})
+        self.assertEqual(status, 200)
+        self.assertIn("milk (2)", body["responses"][1])
+        self.assertEqual(self.route(server, "POST", "/batch", {"messages": ["list", 3]})[0], 400)
+        self.assertEqual(self.route(server, "POST", "/batch", {"messages": "list"})[0], 400)
+        self.assertEqual(self.route(server, "GET", "/batch", {})[0], 405)
+
+    def test_body_must_be_an_object(self):
+        server = GroceryServer(GroceryChatbot(self.open_tracker("json")))
+        for target in ("/message", "/batch", "/metrics"):
+            with self.subTest(target=target):
+                response = self.request(server, "POST", target, b"[1]")
+                self.assertTrue(response.startswith(b"HTTP/1.1 400 "), response)
+                self.assertIn(b"expected a JSON object", response)
+
+    def test_failed_batch_counts_each_command_once(self):
+        metrics.reset()
+        metrics.enable()
+        self.addCleanup(metrics.reset)
+        self.addCleanup(metrics.disable)
+        server = GroceryServer(GroceryChatbot(self.open_tracker("json")))
+        messages = ["add 2 milk", "add bread expires 2025-01-01 expires 2025-01-02",
+                    "list", "add 1 tea"]
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            requests = [(message, loop.create_future()) for message in messages]
+            server._apply_one(server.bot, requests)
+            return [future.exception() is None for _, future in requests]
+        self.assertEqual(asyncio.run(run()), [True, False, True, True])
+
+        counts = {(record["labels"]["command"], record["labels"]["status"]): record["value"]
+                  for record in metrics.records() if record["name"] == "grocery_commands_total"}
+        self.assertEqual(counts, {("add", "ok"): 2, ("add", "error"): 1, ("list", "ok"): 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
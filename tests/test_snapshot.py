@@ -0,0 +1,57 @@
+import os
+import unittest
+
+from grocery.core import GroceryTracker
+from grocery.snapshot import SnapshotStore
+from tests.support import TempDirTestCase, quantities
+
+
+class SnapshotStoreTest(TempDirTestCase):
+    def test_compaction_remaps(self):
+        store = SnapshotStore(self.path("groceries.json"), compact_every=10)
+        tracker = GroceryTracker(store=store, history=False)
+        for i in range(25):
+            tracker.add_item(f"item{i}", i + 1)
+        # Each write maps in the compaction finished before it
+        store.wait()
+        tracker.remove_item("item3")
+        store.wait()
+        tracker.add_item("item4", 1)
+
+        expected = {f"item{i}": i + 1 for i in range(25)}
+        del expected["item3"]
+        expected["item4"] += 1
+        self.assertLess(len(tracker.inventory.changed()), 10)
+        self.assertEqual(quantities(tracker), expected)
+        self.assertEqual({name: quantity for name, _, quantity in store.query_inventory()},
+                         expected)
+        tracker.close()
+        self.assertEqual(quantities(self.open_tracker("snapshot")), expected)
+
+    def test_json_stays_in_step(self):
+        tracker = self.open_tracker("snapshot")
+        tracker.add_item("apple", 2)
+        tracker.add_item("milk", 1)
+        tracker.close()
+        # Another store sees what the snapshot store wrote, and its own
+        # changes show up in the snapshot store next time
+        tracker = self.open_tracker("json")
+        self.assertEqual(quantities(tracker), {"apple": 2, "milk": 1})
+        tracker.add_item("bread", 1)
+        tracker.remove_item("milk")
+        tracker.close()
+
+        tracker = self.open_tracker("snapshot")
+        self.assertEqual(quantities(tracker), {"apple": 2, "bread": 1})
+        tracker.add_item("apple", 1)
+        tracker.close()
+        self.assertEqual(quantities(self.open_tracker("journal")), {"apple": 3, "bread": 1})
+
+        # Opening and closing without changes leaves the JSON alone
+        stamp = os.stat(self.path("groceries.json")).st_mtime_ns
+        self.open_tracker("snapshot").close()
+        self.assertEqual(os.stat(self.path("groceries.json")).st_mtime_ns, stamp)
+
+
+if __name__ == "__main__":
+    unittest.main()
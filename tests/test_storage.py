@@ -0,0 +1,66 @@
+import unittest
+
+from grocery.core import GroceryTracker
+from grocery.items import Item
+from grocery.storage import JsonStore, SQLiteStore
+from tests.support import STORAGES, TempDirTestCase, quantities
+
+
+class StorageTest(TempDirTestCase):
+    def test_round_trip(self):
+        for storage in STORAGES:
+            with self.subTest(storage=storage):
+                self.use_subdir(storage)
+                tracker = self.open_tracker(storage)
+                tracker.add_item("apple", 3, "produce")
+                tracker.add_item("milk", 1, "dairy", "2030-01-02")
+                tracker.remove_item("apple", 1)
+                tracker.close()
+
+                tracker = self.open_tracker(storage)
+                self.assertEqual(quantities(tracker), {"apple": 2, "milk": 1})
+                self.assertEqual(tracker.inventory["milk"].to_dict()["expiry_date"], "2030-01-02")
+                tracker.remove_item("milk")
+                tracker.close()
+                self.assertEqual(quantities(self.open_tracker(storage)), {"apple": 2})
+
+    def test_torn_log_tail_is_dropped(self):
+        tracker = self.open_tracker("journal")
+        tracker.add_item("apple", 1)
+        tracker.add_item("bread", 1)
+        tracker.close()
+        with open(tracker.store.log_file, 'ab') as f:
+            f.write(b'{"op": "put", "item": "cake"')
+
+        tracker = self.open_tracker("journal")
+        self.assertEqual(quantities(tracker), {"apple": 1, "bread": 1})
+        tracker.add_item("cake", 1)
+        tracker.close()
+        self.assertEqual(quantities(self.open_tracker("journal")),
+                         {"apple": 1, "bread": 1, "cake": 1})
+
+    def test_sqlite_imports_json(self):
+        data_file = self.path("groceries.json")
+        JsonStore(data_file).save({"apple": Item.from_dict({"quantity": 3, "category": "produce"})})
+        store = SQLiteStore(self.path("groceries.db"))
+        store.import_json(data_file)
+        self.assertEqual(store.query_inventory(), [("apple", "produce", 3)])
+        store.close()
+
+    def test_two_writers_merge_quantities(self):
+        data_file = self.path("groceries.json")
+        first = GroceryTracker(data_file, history=False)
+        first.add_item("apple", 2)
+        second = GroceryTracker(data_file, history=False)
+        first.add_item("apple", 1)
+        second.add_item("apple", 1)
+        second.add_item("pear", 1)
+        first.add_item("kiwi", 1)
+
+        expected = {"apple": 4, "pear": 1, "kiwi": 1}
+        self.assertEqual(quantities(first), expected)
+        self.assertEqual(quantities(GroceryTracker(data_file, history=False)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
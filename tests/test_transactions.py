@@ -0,0 +1,53 @@
+import unittest
+
+from grocery.core import GroceryChatbot
+from grocery.tenants import TenantManager
+from tests.support import STORAGES, TempDirTestCase, quantities
+
+
+class TransactionTest(TempDirTestCase):
+    def test_failed_batch_changes_nothing(self):
+        for storage in STORAGES:
+            with self.subTest(storage=storage):
+                self.use_subdir(storage)
+                bot = GroceryChatbot(self.open_tracker(storage))
+                bot.process_message("add 2 milk")
+                with self.assertRaises(ValueError):
+                    bot.process_batch(["add 1 tea", "remove milk",
+                                       "add bread expires 2025-01-01 expires 2025-01-02"])
+                self.assertEqual(quantities(bot.tracker), {"milk": 2})
+                bot.tracker.close()
+                self.assertEqual(quantities(self.open_tracker(storage)), {"milk": 2})
+
+    def test_journal_write_is_one_record(self):
+        tracker = self.open_tracker("journal")
+        with tracker.transaction():
+            tracker.add_item("apple", 1)
+            tracker.add_item("bread", 2)
+        tracker.close()
+        with open(tracker.store.log_file, 'rb') as f:
+            data = f.read()
+        self.assertEqual(data.count(b"\n"), 1)
+
+        # Losing the end of the line loses the whole transaction
+        with open(tracker.store.log_file, 'wb') as f:
+            f.write(data[:-10])
+        self.assertEqual(quantities(self.open_tracker("journal")), {})
+
+    def test_write_back_rollback_keeps_unflushed_changes(self):
+        for storage in STORAGES:
+            with self.subTest(storage=storage):
+                root = self.path(storage)
+                tenants = TenantManager(root, storage=storage)
+                tenants.process_message("home", "add 2 milk")
+                with self.assertRaises(ValueError):
+                    tenants.chatbot("home").process_batch(
+                        ["add bread expires 2025-01-01 expires 2025-01-02"])
+                self.assertIn("milk (2)", tenants.process_message("home", "list"))
+                tenants.close()
+                self.assertIn("milk (2)",
+                              TenantManager(root, storage=storage).process_message("home", "list"))
+
+
+if __name__ == "__main__":
+    unittest.main()